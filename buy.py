@@ -1,55 +1,358 @@
 import asyncio
-import json
+import orjson
 import base64
 import struct
-import base58
-import hashlib
 import websockets
 import time
+import os
+import functools
+import httpx
+from collections import deque
 
 from solana.rpc.async_api import AsyncClient
-from solana.transaction import Transaction
 from solana.rpc.commitment import Confirmed
 from solana.rpc.types import TxOpts
 
 from solders.pubkey import Pubkey
-from solders.keypair import Keypair
 from solders.instruction import Instruction, AccountMeta
-from solders.system_program import TransferParams, transfer
 from solders.transaction import VersionedTransaction
+from solders.message import MessageV0
+from solders.compute_budget import set_compute_unit_price
+from solders.hash import Hash
 
 from spl.token.instructions import get_associated_token_address
-import spl.token.instructions as spl_token
 
-from config import *
-
-from construct import Struct, Int64ul, Flag
+from config import (
+    CFG,
+    LAMPORTS_PER_SOL,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_FEE,
+    PUMP_GLOBAL,
+    PUMP_PROGRAM,
+    SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+    SYSTEM_PROGRAM,
+    SYSTEM_RENT,
+    SYSTEM_TOKEN_PROGRAM,
+    WSS_COMPRESSION,
+    WSS_MAX_SIZE,
+    WSS_PING_INTERVAL,
+    WSS_PING_TIMEOUT,
+)
+from utils import create_rpc_client, get_payer, read_string, RPC_TIMEOUT
 
 # Here and later all the discriminators are precalculated. See learning-examples/discriminator.py
 EXPECTED_DISCRIMINATOR = struct.pack("<Q", 6966180631402821399)
+BUY_DISCRIMINATOR = struct.pack("<Q", 16927863322537952870)
+CREATE_DISCRIMINATOR = struct.pack("<Q", 8576854823835016728)
+ATA_CREATE_IDEMPOTENT = bytes([1])  # instruction index of CreateIdempotent in the associated token account program
 TOKEN_DECIMALS = 6
+CREATE_LOG_MESSAGE = "Program log: Instruction: Create"
+
+# Accounts of the buy instruction that don't depend on the token or the payer
+_STATIC_BUY_ACCOUNTS_PREFIX = (
+    AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
+)
+_STATIC_BUY_ACCOUNTS_SUFFIX = (
+    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=SYSTEM_RENT, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
+)
+
+BLOCKHASH_REFRESH_INTERVAL = 5  # seconds; a blockhash stays valid for ~60 seconds
+RPC_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60)
+
+RPC_HEDGED_READS = 2  # number of endpoints that race each read
+RPC_HEALTH_CHECK_INTERVAL = 10  # seconds
+RPC_LATENCY_WINDOW = 50  # latency samples kept per endpoint
+# Reads that are safe to send to several endpoints at once
+HEDGED_READ_METHODS = frozenset({
+    "get_account_info",
+    "get_multiple_accounts",
+    "get_latest_blockhash",
+    "get_token_account_balance",
+    "get_signature_statuses",
+})
+
+async def _first_successful(tasks: list[asyncio.Task]):
+    """
+    Returns the result of the first task that succeeds, or raises the last error if all of them fail
+    """
+    pending = set(tasks)
+    error = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                return task.result()
+            error = task.exception()
+    raise error
+
+class RpcPool:
+    """
+    Drop-in stand-in for AsyncClient that spreads calls over several RPC endpoints.
+    Reads race the fastest endpoints and take the first answer, transactions are sent
+    through every endpoint at once. Endpoints are re-ranked in the background by slot lag
+    and p95 latency. Anything else goes to the best-ranked endpoint.
+    """
+    def __init__(
+        self,
+        clients: list[AsyncClient],
+        send_only_clients: list[AsyncClient],
+        hedged_reads: int = RPC_HEDGED_READS,
+    ) -> None:
+        self.clients = clients
+        # Transactions also go out through the send-only endpoints
+        self.send_clients = clients + send_only_clients
+        self.hedged_reads = hedged_reads
+        self._ranked = list(self.clients)
+        self._latencies = {id(client): deque(maxlen=RPC_LATENCY_WINDOW) for client in self.send_clients}
+        self._background: set[asyncio.Task] = set()
+        self._health_task: asyncio.Task | None = None
+
+    @classmethod
+    async def create(
+        cls,
+        endpoints: list[str] | None = None,
+        send_endpoints: list[str] | None = None,
+        hedged_reads: int = RPC_HEDGED_READS,
+    ) -> "RpcPool":
+        # Without extra endpoints configured the pool is just RPC_ENDPOINT
+        if endpoints is None:
+            endpoints = list(CFG.RPC_ENDPOINTS or (CFG.RPC_ENDPOINT,))
+        if send_endpoints is None:
+            send_endpoints = list(CFG.SEND_TRANSACTION_ENDPOINTS)
+        clients = [await create_rpc_client(endpoint, RPC_HTTP_LIMITS) for endpoint in endpoints]
+        send_only_clients = [await create_rpc_client(endpoint, RPC_HTTP_LIMITS) for endpoint in send_endpoints]
+        return cls(clients, send_only_clients, hedged_reads)
+
+    @property
+    def primary(self) -> AsyncClient:
+        return self._ranked[0]
+
+    def __getattr__(self, name):
+        if name in HEDGED_READ_METHODS:
+            return functools.partial(self.read, name)
+        return getattr(self.primary, name)
+
+    async def _timed(self, client: AsyncClient, method: str, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = await getattr(client, method)(*args, **kwargs)
+        except Exception:
+            # Count failures as timeouts so that a broken endpoint sinks in the ranking
+            self._latencies[id(client)].append(RPC_TIMEOUT)
+            raise
+        self._latencies[id(client)].append(time.perf_counter() - start)
+        return result
+
+    async def read(self, method: str, *args, **kwargs):
+        tasks = [
+            asyncio.create_task(self._timed(client, method, *args, **kwargs))
+            for client in self._ranked[:self.hedged_reads]
+        ]
+        try:
+            return await _first_successful(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def send_transaction(self, *args, **kwargs):
+        return await self._fan_out("send_transaction", *args, **kwargs)
+
+    async def send_raw_transaction(self, *args, **kwargs):
+        return await self._fan_out("send_raw_transaction", *args, **kwargs)
+
+    async def _fan_out(self, method: str, *args, **kwargs):
+        tasks = [
+            asyncio.create_task(self._timed(client, method, *args, **kwargs))
+            for client in self.send_clients
+        ]
+        # The slower sends are left running, they only help the transaction land
+        for task in tasks:
+            self._background.add(task)
+            task.add_done_callback(self._discard_background)
+        return await _first_successful(tasks)
+
+    def _discard_background(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved, the failure was already reported by _first_successful
+
+    def _p95(self, client: AsyncClient) -> float:
+        samples = sorted(self._latencies[id(client)])
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    async def _health_check(self) -> None:
+        while True:
+            slots = await asyncio.gather(
+                *(self._timed(client, "get_slot") for client in self.clients),
+                return_exceptions=True,
+            )
+            best_slot = max((slot.value for slot in slots if not isinstance(slot, BaseException)), default=0)
+            slot_lag = {
+                id(client): float("inf") if isinstance(slot, BaseException) else best_slot - slot.value
+                for client, slot in zip(self.clients, slots)
+            }
+            self._ranked = sorted(self.clients, key=lambda client: (slot_lag[id(client)], self._p95(client)))
+            await asyncio.sleep(RPC_HEALTH_CHECK_INTERVAL)
+
+    def start(self) -> None:
+        if len(self.clients) > 1 and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_check())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for task in list(self._background):
+            task.cancel()
+        for client in self.send_clients:
+            await client.close()
+
+class BlockhashCache:
+    """
+    Keeps a recent blockhash warm in the background so that sending a transaction
+    does not have to wait for a get_latest_blockhash round-trip.
+    """
+    def __init__(self, refresh_interval: float = BLOCKHASH_REFRESH_INTERVAL) -> None:
+        self.refresh_interval = refresh_interval
+        self.value: Hash | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _run(self, client: AsyncClient) -> None:
+        while True:
+            try:
+                self.value = (await client.get_latest_blockhash()).value.blockhash
+            except Exception as e:
+                print(f"Failed to refresh blockhash: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self, client: AsyncClient) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(client))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, client: AsyncClient) -> Hash:
+        # Fall back to a direct fetch if the background task has not been started yet
+        if self.value is None:
+            self.value = (await client.get_latest_blockhash()).value.blockhash
+        return self.value
+
+blockhash_cache = BlockhashCache()
+
+# Payer's associated token accounts, keyed by mint
+_ATA_CACHE: dict[Pubkey, Pubkey] = {}
+
+# Payer's associated token accounts known to exist
+known_associated_token_accounts: set[Pubkey] = set()
+
+def get_payer_associated_token_account(mint: Pubkey) -> Pubkey:
+    associated_token_account = _ATA_CACHE.get(mint)
+    if associated_token_account is None:
+        associated_token_account = _ATA_CACHE[mint] = get_associated_token_address(get_payer().pubkey(), mint)
+    return associated_token_account
+
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_UNPACK_BONDING_CURVE = struct.Struct("<QQQQQ?").unpack_from
 
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _UNPACK_BONDING_CURVE(data, 8)
+
+@functools.cache
+def _json_rpc_session() -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=RPC_TIMEOUT, limits=RPC_HTTP_LIMITS)
+
+async def get_recent_prioritization_fees(writable_accounts: list[Pubkey], endpoint: str | None = None) -> list[int]:
+    """
+    solana-py has no wrapper for getRecentPrioritizationFees, so the request is posted as plain JSON-RPC
+    through a session of our own. It always goes to a single endpoint, RPC_ENDPOINT by default
+    """
+    response = await _json_rpc_session().post(
+        endpoint or CFG.RPC_ENDPOINT,
+        content=orjson.dumps({
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getRecentPrioritizationFees",
+            "params": [[str(account) for account in writable_accounts]],
+        }),
+        headers={"Content-Type": "application/json"},
+    )
+    response.raise_for_status()
+    body = orjson.loads(response.content)
+    if "error" in body:
+        raise ValueError(f"getRecentPrioritizationFees failed: {body['error']}")
+    return [entry["prioritizationFee"] for entry in body["result"]]
+
+async def get_compute_unit_price(writable_accounts: list[Pubkey]) -> int:
+    if not CFG.ENABLE_DYNAMIC_PRIORITY_FEE:
+        return CFG.PRIORITY_FEE_MICROLAMPORTS
+    try:
+        fees = sorted(await get_recent_prioritization_fees(writable_accounts))
+    except Exception as e:
+        print(f"Failed to fetch recent prioritization fees: {str(e)}")
+        return CFG.PRIORITY_FEE_MICROLAMPORTS
+    if not fees:
+        return CFG.PRIORITY_FEE_MICROLAMPORTS
+    return fees[min(len(fees) - 1, int(CFG.PRIORITY_FEE_PERCENTILE * len(fees)))]
+
+def create_idempotent_associated_token_account(payer: Pubkey, owner: Pubkey, mint: Pubkey) -> Instruction:
+    """
+    Same accounts as spl_token.create_associated_token_account, but uses the CreateIdempotent
+    instruction of the associated token account program, which succeeds if the account already exists
+    """
+    return Instruction(
+        SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+        ATA_CREATE_IDEMPOTENT,
+        [
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=get_associated_token_address(owner, mint), is_signer=False, is_writable=True),
+            AccountMeta(pubkey=owner, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+        ],
+    )
 
-async def get_pump_curve_state(conn: AsyncClient, curve_address: Pubkey) -> BondingCurveState:
-    response = await conn.get_account_info(curve_address)
-    if not response.value or not response.value.data:
+def parse_pump_curve_state(account) -> BondingCurveState:
+    if not account or not account.data:
         raise ValueError("Invalid curve state: No data")
 
-    data = response.value.data
-    if data[:8] != EXPECTED_DISCRIMINATOR:
+    data = account.data
+    if not data.startswith(EXPECTED_DISCRIMINATOR):
         raise ValueError("Invalid curve state discriminator")
 
     return BondingCurveState(data)
@@ -60,167 +363,204 @@ def calculate_pump_curve_price(curve_state: BondingCurveState) -> float:
 
     return (curve_state.virtual_sol_reserves / LAMPORTS_PER_SOL) / (curve_state.virtual_token_reserves / 10 ** TOKEN_DECIMALS)
 
-async def buy_token(mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, amount: float, slippage: float = 0.01, max_retries=5):
-    private_key = base58.b58decode(PRIVATE_KEY)
-    payer = Keypair.from_bytes(private_key)
-
-    async with AsyncClient(RPC_ENDPOINT) as client:
-        associated_token_account = get_associated_token_address(payer.pubkey(), mint)
-        amount_lamports = int(amount * LAMPORTS_PER_SOL)
-
-        # Fetch the token price
-        curve_state = await get_pump_curve_state(client, bonding_curve)
-        token_price_sol = calculate_pump_curve_price(curve_state)
-        token_amount = amount / token_price_sol
-
-        # Calculate maximum SOL to spend with slippage
-        max_amount_lamports = int(amount_lamports * (1 + slippage))
-
-        # Create associated token account with retries
-        for ata_attempt in range(max_retries):
-            try:
-                account_info = await client.get_account_info(associated_token_account)
-                if account_info.value is None:
-                    print(f"Creating associated token account (Attempt {ata_attempt + 1})...")
-                    create_ata_ix = spl_token.create_associated_token_account(
-                        payer=payer.pubkey(),
-                        owner=payer.pubkey(),
-                        mint=mint
-                    )
-                    create_ata_tx = Transaction()
-                    create_ata_tx.add(create_ata_ix)
-                    recent_blockhash = await client.get_latest_blockhash()
-                    create_ata_tx.recent_blockhash = recent_blockhash.value.blockhash
-                    await client.send_transaction(create_ata_tx, payer)
-                    print("Associated token account created.")
-                    print(f"Associated token account address: {associated_token_account}")
-                    break
-                else:
-                    print("Associated token account already exists.")
-                    print(f"Associated token account address: {associated_token_account}")
-                    break
-            except Exception as e:
-                print(f"Attempt {ata_attempt + 1} to create associated token account failed: {str(e)}")
-                if ata_attempt < max_retries - 1:
-                    wait_time = 2 ** ata_attempt
-                    print(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    print("Max retries reached. Unable to create associated token account.")
-                    return
-
-        # Continue with the buy transaction
-        for attempt in range(max_retries):
-            try:
-                accounts = [
-                    AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=payer.pubkey(), is_signer=True, is_writable=True),
-                    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_RENT, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
-                ]
-
-                discriminator = struct.pack("<Q", 16927863322537952870)
-                data = discriminator + struct.pack("<Q", int(token_amount * 10**6)) + struct.pack("<Q", max_amount_lamports)
-                buy_ix = Instruction(PUMP_PROGRAM, data, accounts)
-
-                recent_blockhash = await client.get_latest_blockhash()
-                transaction = Transaction()
-                transaction.add(buy_ix)
-                transaction.recent_blockhash = recent_blockhash.value.blockhash
-
-                tx = await client.send_transaction(
-                    transaction,
-                    payer,
-                    opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
-                )
-
-                print(f"Transaction sent: https://explorer.solana.com/tx/{tx.value}")
-
-                await client.confirm_transaction(tx.value, commitment="confirmed")
-                print("Transaction confirmed")
-                return tx.value
-
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    print("Max retries reached. Unable to complete the transaction.")
+async def buy_token(client: AsyncClient, mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, amount: float, slippage: float = 0.01, max_retries=5):
+    """
+    Returns the transaction signature, or None if every attempt failed, together with the token price the buy was priced at
+    """
+    payer = get_payer()
+    payer_pubkey = payer.pubkey()
+
+    associated_token_account = get_payer_associated_token_account(mint)
+    amount_lamports = int(amount * LAMPORTS_PER_SOL)
+
+    # Fetch the bonding curve and check the associated token account in a single round-trip,
+    # while the priority fee is looked up in parallel
+    accounts_response, compute_unit_price = await asyncio.gather(
+        client.get_multiple_accounts([bonding_curve, associated_token_account]),
+        get_compute_unit_price([bonding_curve, associated_bonding_curve]),
+    )
+    curve_account, ata_account = accounts_response.value
+    if ata_account is not None:
+        known_associated_token_accounts.add(associated_token_account)
+
+    # Tokens the SOL amount buys at the current curve price
+    curve_state = parse_pump_curve_state(curve_account)
+    token_price_sol = calculate_pump_curve_price(curve_state)
+    print(f"Token price: {token_price_sol:.10f} SOL")
+    # Same as amount / price, but exact: both sides are already in base units
+    token_amount = (amount_lamports * curve_state.virtual_token_reserves) // curve_state.virtual_sol_reserves
+
+    # Calculate maximum SOL to spend with slippage
+    max_amount_lamports = int(amount_lamports * (1 + slippage))
+
+    # The idempotent create is a no-op if the account exists, so it can ride along with the buy
+    instructions = []
+    if compute_unit_price:
+        instructions.append(set_compute_unit_price(compute_unit_price))
+    if associated_token_account in known_associated_token_accounts:
+        print("Associated token account already exists.")
+    else:
+        print("Creating associated token account together with the buy...")
+        instructions.append(create_idempotent_associated_token_account(payer_pubkey, payer_pubkey, mint))
+    print(f"Associated token account address: {associated_token_account}")
+
+    # Continue with the buy transaction
+    accounts = [
+        *_STATIC_BUY_ACCOUNTS_PREFIX,
+        AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=payer_pubkey, is_signer=True, is_writable=True),
+        *_STATIC_BUY_ACCOUNTS_SUFFIX,
+    ]
+    data = BUY_DISCRIMINATOR + struct.pack("<Q", token_amount) + struct.pack("<Q", max_amount_lamports)
+    instructions.append(Instruction(PUMP_PROGRAM, data, accounts))
+
+    transaction = None
+    for attempt in range(max_retries):
+        try:
+            # Sign once and resend the same bytes, unless the cached blockhash has moved on since
+            recent_blockhash = await blockhash_cache.get(client)
+            if transaction is None or transaction.message.recent_blockhash != recent_blockhash:
+                message = MessageV0.try_compile(payer_pubkey, instructions, [], recent_blockhash)
+                transaction = VersionedTransaction(message, [payer])
+
+            # With an RpcPool this goes out through every configured endpoint at once
+            tx = await client.send_raw_transaction(
+                bytes(transaction),
+                opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
+            )
+
+            print(f"Transaction sent: https://explorer.solana.com/tx/{tx.value}")
+
+            # confirm_transaction only waits for the commitment, a reverted buy is confirmed too
+            resp = await client.confirm_transaction(tx.value, commitment="confirmed")
+            err = resp.value[0].err if resp.value and resp.value[0] else None
+            if err is not None:
+                # The reverted transaction also rolled back the account create, and resending it would be a duplicate
+                print(f"Transaction failed: {err}")
+                return None, token_price_sol
+            known_associated_token_accounts.add(associated_token_account)
+            print("Transaction confirmed")
+            return tx.value, token_price_sol
+
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed: {str(e)}")
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt
+                print(f"Retrying in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+            else:
+                print("Max retries reached. Unable to complete the transaction.")
+    return None, token_price_sol
 
 def load_idl(file_path):
-    with open(file_path, 'r') as f:
-        return json.load(f)
-
-def decode_create_instruction(ix_data, ix_def, accounts):
-    args = {}
-    offset = 8  # Skip 8-byte discriminator
-
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def _read_public_key(view, offset):
+    return base64.b64encode(view[offset:offset+32]).decode('utf-8'), offset + 32
+
+_ARG_READERS = {
+    'string': read_string,
+    'publicKey': _read_public_key,
+}
+
+def compile_create_instruction_decoder(ix_def):
+    """
+    Resolves the IDL arg types of the create instruction once, so that decoding
+    a transaction doesn't walk the IDL and branch on every field
+    """
+    readers = []
     for arg in ix_def['args']:
-        if arg['type'] == 'string':
-            length = struct.unpack_from('<I', ix_data, offset)[0]
-            offset += 4
-            value = ix_data[offset:offset+length].decode('utf-8')
-            offset += length
-        elif arg['type'] == 'publicKey':
-            value = base64.b64encode(ix_data[offset:offset+32]).decode('utf-8')
-            offset += 32
-        else:
+        if arg['type'] not in _ARG_READERS:
             raise ValueError(f"Unsupported type: {arg['type']}")
-        
-        args[arg['name']] = value
-
-    # Add accounts
-    args['mint'] = str(accounts[0])
-    args['bondingCurve'] = str(accounts[2])
-    args['associatedBondingCurve'] = str(accounts[3])
-    args['user'] = str(accounts[7])
+        readers.append((arg['name'], _ARG_READERS[arg['type']]))
+    readers = tuple(readers)
+
+    def decode_create_instruction(ix_data, accounts):
+        args = {}
+        offset = 8  # Skip 8-byte discriminator
+        view = memoryview(ix_data)
+
+        for name, read in readers:
+            args[name], offset = read(view, offset)
+
+        # Add accounts
+        args['mint'] = str(accounts[0])
+        args['bondingCurve'] = str(accounts[2])
+        args['associatedBondingCurve'] = str(accounts[3])
+        args['user'] = str(accounts[7])
+
+        return args
+
+    return decode_create_instruction
+
+IDL = load_idl(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'idl', 'pump_fun_idl.json'))
+decode_create_instruction = compile_create_instruction_decoder(
+    next(instr for instr in IDL['instructions'] if instr['name'] == 'create')
+)
+
+def may_contain_create(tx: dict) -> bool:
+    """
+    Cheap pre-filter on the JSON transaction meta, so that only successful transactions
+    that logged a Create instruction get base64-decoded and deserialized
+    """
+    meta = tx.get('meta')
+    if not meta:
+        return True
+    if meta.get('err') is not None:
+        return False
+    logs = meta.get('logMessages')
+    if logs is None:
+        return True
+    return any(CREATE_LOG_MESSAGE in log for log in logs)
+
+def install_event_loop():
+    """
+    Run on uvloop where it is available, it cuts the per-call overhead of the websocket and RPC loops
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+
+def connect_websocket(endpoint: str = CFG.WSS_ENDPOINT):
+    return websockets.connect(
+        endpoint,
+        ping_interval=WSS_PING_INTERVAL,
+        ping_timeout=WSS_PING_TIMEOUT,
+        max_size=WSS_MAX_SIZE,
+        compression=WSS_COMPRESSION,
+    )
 
-    return args
+# Sent as text, RPC nodes expect JSON-RPC over text frames
+CREATE_SUBSCRIPTION_MESSAGE = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "blockSubscribe",
+    "params": [
+        {"mentionsAccountOrProgram": str(PUMP_PROGRAM)},
+        {
+            "commitment": "confirmed",
+            "encoding": "base64",
+            "showRewards": False,
+            "transactionDetails": "full",
+            "maxSupportedTransactionVersion": 0
+        }
+    ]
+}).decode()
 
 async def listen_for_create_transaction(websocket):
-    idl = load_idl('idl/pump_fun_idl.json')
-    create_discriminator = 8576854823835016728
-    
-    subscription_message = json.dumps({
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "blockSubscribe",
-        "params": [
-            {"mentionsAccountOrProgram": str(PUMP_PROGRAM)},
-            {
-                "commitment": "confirmed",
-                "encoding": "base64",
-                "showRewards": False,
-                "transactionDetails": "full",
-                "maxSupportedTransactionVersion": 0
-            }
-        ]
-    })
-    await websocket.send(subscription_message)
+    await websocket.send(CREATE_SUBSCRIPTION_MESSAGE)
     print(f"Subscribed to blocks mentioning program: {PUMP_PROGRAM}")
 
-    ping_interval = 20
-    last_ping_time = time.time()
-
     while True:
         try:
-            current_time = time.time()
-            if current_time - last_ping_time > ping_interval:
-                await websocket.ping()
-                last_ping_time = current_time
-
-            response = await asyncio.wait_for(websocket.recv(), timeout=30)
-            data = json.loads(response)
+            response = await websocket.recv()
+            data = orjson.loads(response)
             
             if 'method' in data and data['method'] == 'blockNotification':
                 if 'params' in data and 'result' in data['params']:
@@ -229,24 +569,25 @@ async def listen_for_create_transaction(websocket):
                         block = block_data['value']['block']
                         if 'transactions' in block:
                             for tx in block['transactions']:
-                                if isinstance(tx, dict) and 'transaction' in tx:
+                                if isinstance(tx, dict) and 'transaction' in tx and may_contain_create(tx):
                                     tx_data_decoded = base64.b64decode(tx['transaction'][0])
+                                    # A Create instruction's data has to appear verbatim in the raw bytes,
+                                    # so a byte search rules most transactions out before the full deserialization
+                                    if CREATE_DISCRIMINATOR not in tx_data_decoded:
+                                        continue
                                     transaction = VersionedTransaction.from_bytes(tx_data_decoded)
+                                    message = transaction.message
+                                    message_account_keys = message.account_keys
                                     
-                                    for ix in transaction.message.instructions:
-                                        if str(transaction.message.account_keys[ix.program_id_index]) == str(PUMP_PROGRAM):
+                                    for ix in message.instructions:
+                                        # Compare Pubkeys directly, str() would base58-encode both sides on every instruction
+                                        if message_account_keys[ix.program_id_index] == PUMP_PROGRAM:
                                             ix_data = bytes(ix.data)
-                                            discriminator = struct.unpack('<Q', ix_data[:8])[0]
                                             
-                                            if discriminator == create_discriminator:
-                                                create_ix = next(instr for instr in idl['instructions'] if instr['name'] == 'create')
-                                                account_keys = [str(transaction.message.account_keys[index]) for index in ix.accounts]
-                                                decoded_args = decode_create_instruction(ix_data, create_ix, account_keys)
+                                            if ix_data.startswith(CREATE_DISCRIMINATOR):
+                                                account_keys = [message_account_keys[index] for index in ix.accounts]
+                                                decoded_args = decode_create_instruction(ix_data, account_keys)
                                                 return decoded_args
-        except asyncio.TimeoutError:
-            print("No data received for 30 seconds, sending ping...")
-            await websocket.ping()
-            last_ping_time = time.time()
         except websockets.exceptions.ConnectionClosed:
             print("WebSocket connection closed. Reconnecting...")
             raise
@@ -255,7 +596,7 @@ async def main(yolo_mode=False):
     if yolo_mode:
         while True:
             try:
-                async with websockets.connect(WSS_ENDPOINT) as websocket:
+                async with connect_websocket() as websocket:
                     while True:
                         try:
                             await trade(websocket)
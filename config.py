@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 from solders.pubkey import Pubkey
 
 # System & pump.fun addresses
@@ -13,15 +15,41 @@ SYSTEM_RENT = Pubkey.from_string("SysvarRent111111111111111111111111111111111")
 SOL = Pubkey.from_string("So11111111111111111111111111111111111111112")
 LAMPORTS_PER_SOL = 1_000_000_000
 
-# Trading parameters
-BUY_AMOUNT = 0.0001  # Amount of SOL to spend when buying
-BUY_SLIPPAGE = 0.2  # 20% slippage tolerance for buying
-SELL_SLIPPAGE = 0.2  # 20% slippage tolerance for selling
+# Keepalive is left to the websockets library, which pings from its own task.
+# Block notifications with full transactions can be larger than the default 1 MiB frame limit.
+WSS_PING_INTERVAL = 20
+WSS_PING_TIMEOUT = 20
+WSS_MAX_SIZE = 2**24
+# Inflating every notification costs more CPU than the bandwidth saves, set to "deflate" if the link is slow
+WSS_COMPRESSION = None
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Single source of truth for the settings, edit the defaults below
+    """
+    # Trading parameters
+    BUY_AMOUNT: float = 0.0001  # Amount of SOL to spend when buying
+    BUY_SLIPPAGE: float = 0.2  # 20% slippage tolerance for buying
+    SELL_SLIPPAGE: float = 0.2  # 20% slippage tolerance for selling
+
+    # Your nodes
+    # You can also get a trader node https://docs.chainstack.com/docs/solana-trader-nodes
+    RPC_ENDPOINT: str = "SOLANA_NODE_RPC_ENDPOINT"
+    WSS_ENDPOINT: str = "SOLANA_NODE_WSS_ENDPOINT"
+    # Add more nodes (e.g. a trader node or a node in another region) to race reads and fan out transactions,
+    # left empty only RPC_ENDPOINT is used
+    RPC_ENDPOINTS: tuple[str, ...] = ()
+    # Endpoints that only receive transactions, e.g. Jito's "https://mainnet.block-engine.jito.wtf/api/v1/transactions"
+    SEND_TRANSACTION_ENDPOINTS: tuple[str, ...] = ()
+    MAX_RPS: int = 25  # Requests per second allowed by your RPC plan
+
+    # Priority fee
+    ENABLE_DYNAMIC_PRIORITY_FEE: bool = False  # Derive the compute unit price from getRecentPrioritizationFees
+    PRIORITY_FEE_PERCENTILE: float = 0.75  # Percentile of the recent fees to pay when the dynamic fee is enabled
+    PRIORITY_FEE_MICROLAMPORTS: int = 0  # Compute unit price otherwise, 0 sends no priority fee
 
-# Your nodes
-# You can also get a trader node https://docs.chainstack.com/docs/solana-trader-nodes
-RPC_ENDPOINT = "SOLANA_NODE_RPC_ENDPOINT"
-WSS_ENDPOINT = "SOLANA_NODE_WSS_ENDPOINT"
+    # Private key
+    PRIVATE_KEY: str = "SOLANA_PRIVATE_KEY"
 
-#Private key
-PRIVATE_KEY = "SOLANA_PRIVATE_KEY"
+CFG = Config()
@@ -1,66 +1,181 @@
 import asyncio
 import hashlib
-import json
+import logging
+import orjson
 import os
 import sys
+import msgspec
 import websockets
+from typing import Any, Optional
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import WSS_ENDPOINT, PUMP_PROGRAM
+from config import CFG, PUMP_PROGRAM
 
-async def save_transaction(tx_data, tx_signature):
-    os.makedirs("blockSubscribe-transactions", exist_ok=True)
-    hashed_signature = hashlib.sha256(tx_signature.encode()).hexdigest()
-    file_path = os.path.join("blockSubscribe-transactions", f"{hashed_signature}.json")
-    with open(file_path, 'w') as f:
-        json.dump(tx_data, f, indent=2)
-    print(f"Saved transaction: {hashed_signature[:8]}...")
+# Only the path down to the transactions is typed, msgspec skips everything else in the notification
+class Block(msgspec.Struct):
+    # Kept as raw JSON, it is written to disk as is
+    transactions: list[msgspec.Raw] = []
 
-async def listen_for_transactions():
-    async with websockets.connect(WSS_ENDPOINT) as websocket:
-        subscription_message = json.dumps({
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "blockSubscribe",
-            "params": [
-                {"mentionsAccountOrProgram": str(PUMP_PROGRAM)},
-                {
-                    "commitment": "confirmed",
-                    "encoding": "base64",
-                    "showRewards": False,
-                    "transactionDetails": "full",
-                    "maxSupportedTransactionVersion": 0
-                }
-            ]
-        })
-        await websocket.send(subscription_message)
-        print(f"Subscribed to blocks mentioning program: {PUMP_PROGRAM}")
-
-        while True:
+class BlockValue(msgspec.Struct):
+    block: Optional[Block] = None
+
+class BlockResult(msgspec.Struct):
+    value: BlockValue
+
+class BlockParams(msgspec.Struct):
+    result: BlockResult
+
+class BlockNotification(msgspec.Struct):
+    method: Optional[str] = None
+    params: Optional[BlockParams] = None
+    result: Any = None
+
+class Transaction(msgspec.Struct):
+    transaction: Any = None
+
+notification_decoder = msgspec.json.Decoder(BlockNotification)
+transaction_decoder = msgspec.json.Decoder(Transaction)
+
+SUBSCRIPTION_MESSAGE = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "blockSubscribe",
+    "params": [
+        {"mentionsAccountOrProgram": str(PUMP_PROGRAM)},
+        {
+            "commitment": "confirmed",
+            "encoding": "base64",
+            "showRewards": False,
+            "transactionDetails": "full",
+            "maxSupportedTransactionVersion": 0
+        }
+    ]
+}).decode()
+
+logger = logging.getLogger(__name__)
+
+TRANSACTIONS_DIR = "blockSubscribe-transactions"
+# Upper bound for the reconnect backoff, in seconds
+MAX_RECONNECT_DELAY = 30
+# Notifications that could not be decoded, reported instead of printing each one
+decode_errors = 0
+# Raw notifications waiting for the decoder
+RAW_QUEUE_SIZE = 2048
+# Transactions waiting to be written, the receive loop never blocks on disk I/O
+WRITE_QUEUE_SIZE = 10000
+# A batch is flushed once it holds this many transactions or after this many seconds
+WRITE_BATCH_SIZE = 64
+WRITE_BATCH_DELAY = 0.1
+
+def save_transaction(tx_data, tx_signature):
+    # With base64 encoding the "signature" is the whole serialized transaction, which can contain '/',
+    # so it still gets hashed into a file name, just with the cheaper blake2b
+    hashed_signature = hashlib.blake2b(tx_signature.encode(), digest_size=16).hexdigest()
+    file_path = os.path.join(TRANSACTIONS_DIR, f"{hashed_signature}.json")
+    with open(file_path, 'wb') as f:
+        # Pretty-print the raw JSON without decoding it into Python objects
+        f.write(msgspec.json.format(tx_data, indent=2))
+    return hashed_signature
+
+def _flush_batch(items):
+    for tx_data, tx_signature in items:
+        hashed_signature = save_transaction(tx_data, tx_signature)
+        logger.debug("Saved transaction: %s...", hashed_signature[:8])
+
+async def writer(write_queue: asyncio.Queue):
+    """
+    Coalesces queued transactions into batches and writes each batch in a worker thread
+    """
+    os.makedirs(TRANSACTIONS_DIR, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await write_queue.get()]
+        deadline = loop.time() + WRITE_BATCH_DELAY
+        while len(batch) < WRITE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
             try:
-                response = await websocket.recv()
-                data = json.loads(response)
-                
-                if 'method' in data and data['method'] == 'blockNotification':
-                    if 'params' in data and 'result' in data['params']:
-                        block_data = data['params']['result']
-                        if 'value' in block_data and 'block' in block_data['value']:
-                            block = block_data['value']['block']
-                            if 'transactions' in block:
-                                transactions = block['transactions']
-                                for tx in transactions:
-                                    if isinstance(tx, dict) and 'transaction' in tx:
-                                        if isinstance(tx['transaction'], list) and len(tx['transaction']) > 0:
-                                            tx_signature = tx['transaction'][0]
-                                        elif isinstance(tx['transaction'], dict) and 'signatures' in tx['transaction']:
-                                            tx_signature = tx['transaction']['signatures'][0]
-                                        else:
-                                            continue
-                                        await save_transaction(tx, tx_signature)
-                elif 'result' in data:
-                    print(f"Subscription confirmed")
-            except Exception as e:
-                print(f"An error occurred: {str(e)}")
+                batch.append(await asyncio.wait_for(write_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await asyncio.to_thread(_flush_batch, batch)
+        except Exception as e:
+            logger.error("Failed to save transactions: %s", e)
+
+async def decoder(raw_queue: asyncio.Queue, write_queue: asyncio.Queue):
+    """
+    Turns raw block notifications into (transaction, signature) pairs for the writer
+    """
+    global decode_errors
+    while True:
+        response = await raw_queue.get()
+        try:
+            data = notification_decoder.decode(response)
+
+            if data.method == 'blockNotification':
+                block = data.params.result.value.block if data.params else None
+                if block is not None:
+                    for raw_tx in block.transactions:
+                        tx = transaction_decoder.decode(raw_tx).transaction
+                        if isinstance(tx, list) and len(tx) > 0:
+                            tx_signature = tx[0]
+                        elif isinstance(tx, dict) and 'signatures' in tx:
+                            tx_signature = tx['signatures'][0]
+                        else:
+                            continue
+                        try:
+                            write_queue.put_nowait((raw_tx, tx_signature))
+                        except asyncio.QueueFull:
+                            logger.warning("Write queue is full, dropping transaction")
+            elif data.result is not None:
+                logger.info("Subscription confirmed")
+        except msgspec.DecodeError:
+            decode_errors += 1
+        except Exception as e:
+            logger.error("Failed to process block notification: %s", e)
+
+async def listen_for_transactions():
+    # Reader -> decoder -> writer, so the socket is drained no matter how slow decoding or disk I/O gets.
+    # Decoding runs on the event loop, so a single decoder task is all that helps.
+    raw_queue = asyncio.Queue(maxsize=RAW_QUEUE_SIZE)
+    write_queue = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
+    tasks = [asyncio.create_task(decoder(raw_queue, write_queue)), asyncio.create_task(writer(write_queue))]
+    try:
+        await _listen_for_transactions(raw_queue)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def _listen_for_transactions(raw_queue: asyncio.Queue):
+    attempt = 0
+    while True:
+        try:
+            # Full block notifications easily exceed the default 1 MiB frame limit, and inflating them costs more CPU
+            # than the bandwidth saves. If your provider compresses well, keep compression="deflate" instead.
+            async with websockets.connect(
+                CFG.WSS_ENDPOINT,
+                max_size=64 * 1024 * 1024,
+                compression=None,
+                ping_interval=20,
+            ) as websocket:
+                await websocket.send(SUBSCRIPTION_MESSAGE)
+                logger.info("Subscribed to blocks mentioning program: %s", PUMP_PROGRAM)
+                attempt = 0
+
+                # The reader only moves frames off the socket, decoding happens in the decoder task
+                async for response in websocket:
+                    try:
+                        raw_queue.put_nowait(response)
+                    except asyncio.QueueFull:
+                        logger.warning("Decode queue is full, dropping block notification")
+        except (websockets.ConnectionClosed, OSError) as e:
+            delay = min(2 ** attempt, MAX_RECONNECT_DELAY)
+            attempt += 1
+            logger.warning("Connection lost (%s), %d undecodable notifications so far. Reconnecting in %ds...", e, decode_errors, delay)
+            await asyncio.sleep(delay)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     asyncio.run(listen_for_transactions())
\ No newline at end of file
@@ -1,6 +1,8 @@
 import hashlib
 import struct
 
+_U64 = struct.Struct("<Q")
+
 # https://book.anchor-lang.com/anchor_bts/discriminator.html
 # Set the instruction name here
 instruction_name = "account:BondingCurve"
@@ -16,7 +18,7 @@ def calculate_discriminator(instruction_name):
     discriminator_bytes = sha.digest()[:8]
     
     # Convert the bytes to a 64-bit unsigned integer (little-endian)
-    discriminator = struct.unpack('<Q', discriminator_bytes)[0]
+    discriminator = _U64.unpack(discriminator_bytes)[0]
     
     return discriminator
 
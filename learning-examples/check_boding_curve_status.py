@@ -1,7 +1,8 @@
 import asyncio
+import functools
 import struct
 from typing import Final
-from construct import Struct, Int64ul, Flag
+import httpx
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 import argparse
@@ -9,49 +10,115 @@ import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import RPC_ENDPOINT, PUMP_PROGRAM
+from config import CFG, PUMP_PROGRAM
+from buy import install_event_loop
+from utils import create_rpc_client
 
 # Constants
 EXPECTED_DISCRIMINATOR: Final[bytes] = struct.pack("<Q", 6966180631402821399)
+# getMultipleAccounts accepts at most this many accounts per request
+MULTIPLE_ACCOUNTS_LIMIT: Final[int] = 100
+
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_CURVE = struct.Struct("<QQQQQ?")
+_CREATOR_OFFSET: Final[int] = 8 + _CURVE.size
 
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
+        "creator",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _CURVE.unpack_from(data, 8)
+        # Newer curve accounts also store the creator right after the reserves
+        if len(data) >= _CREATOR_OFFSET + 32:
+            self.creator = Pubkey.from_bytes(data[_CREATOR_OFFSET:_CREATOR_OFFSET + 32])
+        else:
+            self.creator = None
 
-def get_associated_bonding_curve_address(mint: Pubkey, program_id: Pubkey) -> tuple[Pubkey, int]:
+@functools.lru_cache(maxsize=4096)
+def get_associated_bonding_curve_address_bytes(mint_bytes: bytes, program_id: Pubkey) -> tuple[Pubkey, int]:
     """
-    Derives the associated bonding curve address for a given mint
+    Derives the associated bonding curve address from the raw mint bytes, memoized per mint
     """
+    # find_program_address may hash up to 256 candidate seeds, do it once per mint
     return Pubkey.find_program_address(
         [
             b"bonding-curve",
-            bytes(mint)
+            mint_bytes
         ],
         program_id
     )
 
+def get_associated_bonding_curve_address(mint: Pubkey, program_id: Pubkey) -> tuple[Pubkey, int]:
+    """
+    Derives the associated bonding curve address for a given mint
+    """
+    return get_associated_bonding_curve_address_bytes(bytes(mint), program_id)
+
 async def get_bonding_curve_state(conn: AsyncClient, curve_address: Pubkey) -> BondingCurveState:
     response = await conn.get_account_info(curve_address)
     if not response.value or not response.value.data:
         raise ValueError("Invalid curve state: No data")
 
     data = response.value.data
-    if data[:8] != EXPECTED_DISCRIMINATOR:
+    if not data.startswith(EXPECTED_DISCRIMINATOR):
         raise ValueError("Invalid curve state discriminator")
 
     return BondingCurveState(data)
 
-async def check_token_status(mint_address: str) -> None:
+async def get_many_curve_states(conn: AsyncClient, addrs: list[Pubkey]) -> list[BondingCurveState | None]:
+    """
+    Fetches many bonding curves with one getMultipleAccounts request per 100 curves instead of one request each
+    """
+    responses = await asyncio.gather(*(
+        conn.get_multiple_accounts(addrs[i:i + MULTIPLE_ACCOUNTS_LIMIT], encoding="base64")
+        for i in range(0, len(addrs), MULTIPLE_ACCOUNTS_LIMIT)
+    ))
+    states = []
+    for response in responses:
+        for account in response.value:
+            if account is None or not account.data.startswith(EXPECTED_DISCRIMINATOR):
+                states.append(None)
+            else:
+                states.append(BondingCurveState(account.data))
+    return states
+
+_client_singleton: AsyncClient | None = None
+
+async def get_client() -> AsyncClient:
+    """
+    Returns the process-wide client, so repeated checks reuse warm keep-alive connections
+    """
+    global _client_singleton
+    if _client_singleton is None:
+        # A keep-alive connection per request the RPC plan allows in a second
+        _client_singleton = await create_rpc_client(
+            CFG.RPC_ENDPOINT,
+            httpx.Limits(max_keepalive_connections=CFG.MAX_RPS, keepalive_expiry=60),
+        )
+    return _client_singleton
+
+async def close_client() -> None:
+    global _client_singleton
+    if _client_singleton is not None:
+        await _client_singleton.close()
+        _client_singleton = None
+
+async def check_token_status(mint_address: str, client: AsyncClient | None = None) -> None:
     try:
         mint = Pubkey.from_string(mint_address)
         
@@ -66,31 +133,76 @@ async def check_token_status(mint_address: str) -> None:
         print("-" * 50)
         
         # Check completion status
-        async with AsyncClient(RPC_ENDPOINT) as client:
-            try:
-                curve_state = await get_bonding_curve_state(client, bonding_curve_address)
-                
-                print("\nBonding Curve Status:")
-                print("-" * 50)
-                print(f"Completion Status: {'Completed' if curve_state.complete else 'Not Completed'}")
-                if curve_state.complete:
-                    print("\nNote: This bonding curve has completed and liquidity has been migrated to Raydium.")
-                print("-" * 50)
-                
-            except ValueError as e:
-                print(f"\nError accessing bonding curve: {e}")
+        try:
+            curve_state = await get_bonding_curve_state(client or await get_client(), bonding_curve_address)
+            
+            print("\nBonding Curve Status:")
+            print("-" * 50)
+            print(f"Completion Status: {'Completed' if curve_state.complete else 'Not Completed'}")
+            if curve_state.complete:
+                print("\nNote: This bonding curve has completed and liquidity has been migrated to Raydium.")
+            print("-" * 50)
+            
+        except ValueError as e:
+            print(f"\nError accessing bonding curve: {e}")
             
     except ValueError as e:
         print(f"\nError: Invalid address format - {e}")
     except Exception as e:
         print(f"\nUnexpected error: {e}")
 
+async def check_tokens_status(mint_addresses: list[str], client: AsyncClient | None = None) -> None:
+    try:
+        mints = [Pubkey.from_string(mint_address) for mint_address in mint_addresses]
+    except ValueError as e:
+        print(f"\nError: Invalid address format - {e}")
+        return
+
+    curves = [get_associated_bonding_curve_address(mint, PUMP_PROGRAM) for mint in mints]
+    try:
+        states = await get_many_curve_states(client or await get_client(), [address for address, _ in curves])
+    except Exception as e:
+        print(f"\nUnexpected error: {e}")
+        return
+
+    # Collect the report and write it once instead of one print per line
+    lines = []
+    for mint, (bonding_curve_address, bump), curve_state in zip(mints, curves, states):
+        lines.append("\nToken Status:")
+        lines.append("-" * 50)
+        lines.append(f"Token Mint:              {mint}")
+        lines.append(f"Associated Bonding Curve: {bonding_curve_address}")
+        lines.append(f"Bump Seed:               {bump}")
+        lines.append("-" * 50)
+
+        if curve_state is None:
+            lines.append("\nError accessing bonding curve: Invalid curve state")
+            continue
+
+        lines.append("\nBonding Curve Status:")
+        lines.append("-" * 50)
+        lines.append(f"Completion Status: {'Completed' if curve_state.complete else 'Not Completed'}")
+        if curve_state.complete:
+            lines.append("\nNote: This bonding curve has completed and liquidity has been migrated to Raydium.")
+        lines.append("-" * 50)
+    print("\n".join(lines))
+
+async def run(mint_addresses: list[str]) -> None:
+    try:
+        if len(mint_addresses) == 1:
+            await check_token_status(mint_addresses[0])
+        else:
+            await check_tokens_status(mint_addresses)
+    finally:
+        await close_client()
+
 def main():
     parser = argparse.ArgumentParser(description='Check token bonding curve status')
-    parser.add_argument('mint_address', help='The token mint address')
+    parser.add_argument('mint_addresses', nargs='+', help='One or more token mint addresses')
     
     args = parser.parse_args()
-    asyncio.run(check_token_status(args.mint_address))
+    install_event_loop()
+    asyncio.run(run(args.mint_addresses))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
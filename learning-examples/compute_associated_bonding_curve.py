@@ -1,40 +1,53 @@
+import functools
 import sys
 import os
 from solders.pubkey import Pubkey
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config import PUMP_PROGRAM
+from config import SYSTEM_TOKEN_PROGRAM as TOKEN_PROGRAM_ID
+from config import SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM as ATA_PROGRAM_ID
 
-def get_bonding_curve_address(mint: Pubkey, program_id: Pubkey) -> tuple[Pubkey, int]:
-    """
-    Derives the bonding curve address for a given mint
-    """
+# Seeds that never change, converted once instead of on every derivation
+_BONDING_CURVE_SEED = b"bonding-curve"
+_TOKEN_PROGRAM_BYTES = bytes(TOKEN_PROGRAM_ID)
+
+@functools.lru_cache(maxsize=4096)
+def _get_bonding_curve_address_impl(mint_bytes: bytes, program_id_bytes: bytes) -> tuple[Pubkey, int]:
     return Pubkey.find_program_address(
         [
-            b"bonding-curve",
-            bytes(mint)
+            _BONDING_CURVE_SEED,
+            mint_bytes
         ],
-        program_id
+        Pubkey.from_bytes(program_id_bytes)
     )
 
-def find_associated_bonding_curve(mint: Pubkey, bonding_curve: Pubkey) -> Pubkey:
+def get_bonding_curve_address(mint: Pubkey, program_id: Pubkey) -> tuple[Pubkey, int]:
     """
-    Find the associated bonding curve for a given mint and bonding curve.
-    This uses the standard ATA derivation.
+    Derives the bonding curve address for a given mint
     """
-    from config import SYSTEM_TOKEN_PROGRAM as TOKEN_PROGRAM_ID
-    from config import SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM as ATA_PROGRAM_ID
-    
+    # find_program_address may hash up to 256 candidate seeds, so repeat derivations come from the cache
+    return _get_bonding_curve_address_impl(bytes(mint), bytes(program_id))
+
+@functools.lru_cache(maxsize=4096)
+def _find_associated_bonding_curve_impl(mint_bytes: bytes, bonding_curve_bytes: bytes) -> Pubkey:
     derived_address, _ = Pubkey.find_program_address(
         [
-            bytes(bonding_curve),
-            bytes(TOKEN_PROGRAM_ID),
-            bytes(mint), 
+            bonding_curve_bytes,
+            _TOKEN_PROGRAM_BYTES,
+            mint_bytes,
         ],
         ATA_PROGRAM_ID
     )
     return derived_address
 
+def find_associated_bonding_curve(mint: Pubkey, bonding_curve: Pubkey) -> Pubkey:
+    """
+    Find the associated bonding curve for a given mint and bonding curve.
+    This uses the standard ATA derivation.
+    """
+    return _find_associated_bonding_curve_impl(bytes(mint), bytes(bonding_curve))
+
 def main():
 
     mint_address = input("Enter the token mint address: ")
@@ -1,19 +1,28 @@
 import base64
-import json
+import orjson
 import struct
 import hashlib
+import logging
 from solana.transaction import Transaction
 from solders.transaction import VersionedTransaction
 from solders.pubkey import Pubkey
 import sys
 
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
+COMPUTE_BUDGET_PROGRAM = Pubkey.from_string("ComputeBudget111111111111111111111111111111")
+ASSOCIATED_TOKEN_PROGRAM = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+
+logger = logging.getLogger(__name__)
+
 def load_idl(file_path):
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
 
 def load_transaction(file_path):
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    with open(file_path, 'rb') as f:
+        data = orjson.loads(f.read())
     return data
 
 def decode_instruction(ix_data, ix_def):
@@ -22,13 +31,13 @@ def decode_instruction(ix_data, ix_def):
 
     for arg in ix_def['args']:
         if arg['type'] == 'u64':
-            value = struct.unpack_from('<Q', ix_data, offset)[0]
+            value = _U64.unpack_from(ix_data, offset)[0]
             offset += 8
         elif arg['type'] == 'publicKey':
             value = ix_data[offset:offset+32].hex()
             offset += 32
         elif arg['type'] == 'string':
-            length = struct.unpack_from('<I', ix_data, offset)[0]
+            length = _U32.unpack_from(ix_data, offset)[0]
             offset += 4
             value = ix_data[offset:offset+length].decode('utf-8')
             offset += length
@@ -40,13 +49,13 @@ def decode_instruction(ix_data, ix_def):
     return args
 
 def calculate_discriminator(instruction_name):
-    sha = hashlib.sha256()
-    sha.update(instruction_name.encode('utf-8'))
-    discriminator_bytes = sha.digest()[:8]
-    discriminator = struct.unpack('<Q', discriminator_bytes)[0]
-    return discriminator
+    return int.from_bytes(hashlib.sha256(instruction_name.encode('utf-8')).digest()[:8], 'little')
 
-def decode_transaction(tx_data, idl):
+def build_discriminator_table(idl):
+    # Hash every IDL instruction name once instead of once per decoded instruction
+    return {calculate_discriminator(f"global:{ix['name']}"): ix for ix in idl['instructions']}
+
+def decode_transaction(tx_data, idl, discriminator_table):
     decoded_instructions = []
     
     # Decode the base64 transaction data
@@ -58,64 +67,64 @@ def decode_transaction(tx_data, idl):
         transaction = VersionedTransaction.from_bytes(tx_data_decoded)
         instructions = transaction.message.instructions
         account_keys = transaction.message.account_keys
-        print("Versioned transaction detected")
+        logger.debug("Versioned transaction detected")
     else:
         # Use legacy deserialization for older transactions
         transaction = Transaction.deserialize(tx_data_decoded)
         instructions = transaction.instructions
         account_keys = transaction.message.account_keys
-        print("Legacy transaction detected")
+        logger.debug("Legacy transaction detected")
     
-    print(f"Number of instructions: {len(instructions)}")
+    logger.debug("Number of instructions: %d", len(instructions))
+
+    # Base58-encode every key once, instructions keep referencing the same accounts
+    account_key_strs = list(map(str, account_keys))
+    # Program checks compare the raw 32-byte keys
+    pump_program = Pubkey.from_string(idl['metadata']['address'])
     
     for idx, ix in enumerate(instructions):
-        program_id = str(account_keys[ix.program_id_index])
-        print(f"\nInstruction {idx}:")
-        print(f"Program ID: {program_id}")
-        print(f"IDL program address: {idl['metadata']['address']}")
+        program_key = account_keys[ix.program_id_index]
+        program_id = account_key_strs[ix.program_id_index]
+        logger.debug("Instruction %d: program %s", idx, program_id)
         
-        if program_id == idl['metadata']['address']:
+        if program_key == pump_program:
             ix_data = bytes(ix.data)
-            discriminator = struct.unpack('<Q', ix_data[:8])[0]
+            discriminator = int.from_bytes(ix_data[:8], 'little')
             
-            print(f"Discriminator: {discriminator:016x}")
+            logger.debug("Discriminator: %016x", discriminator)
             
-            for idl_ix in idl['instructions']:
-                idl_discriminator = calculate_discriminator(f"global:{idl_ix['name']}")
-                print(f"Checking against IDL instruction: {idl_ix['name']} with discriminator {idl_discriminator:016x}")
-                
-                if discriminator == idl_discriminator:
-                    decoded_args = decode_instruction(ix_data, idl_ix)
-                    accounts = [str(account_keys[acc_idx]) for acc_idx in ix.accounts]
-                    decoded_instructions.append({
-                        'name': idl_ix['name'],
-                        'args': decoded_args,
-                        'accounts': accounts,
-                        'program': program_id
-                    })
-                    break
+            idl_ix = discriminator_table.get(discriminator)
+            if idl_ix is not None:
+                decoded_args = decode_instruction(ix_data, idl_ix)
+                accounts = [account_key_strs[acc_idx] for acc_idx in ix.accounts]
+                decoded_instructions.append({
+                    'name': idl_ix['name'],
+                    'args': decoded_args,
+                    'accounts': accounts,
+                    'program': program_id
+                })
             else:
                 decoded_instructions.append({
                     'name': 'Unknown',
                     'data': ix_data.hex(),
-                    'accounts': [str(account_keys[acc_idx]) for acc_idx in ix.accounts],
+                    'accounts': [account_key_strs[acc_idx] for acc_idx in ix.accounts],
                     'program': program_id
                 })
         else:
             instruction_name = 'External'
-            if program_id == 'ComputeBudget111111111111111111111111111111':
+            if program_key == COMPUTE_BUDGET_PROGRAM:
                 if ix.data[:1] == b'\x03':
                     instruction_name = 'ComputeBudget: Set compute unit limit'
                 elif ix.data[:1] == b'\x02':
                     instruction_name = 'ComputeBudget: Set compute unit price'
-            elif program_id == 'ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL':
+            elif program_key == ASSOCIATED_TOKEN_PROGRAM:
                 instruction_name = 'Associated Token Account: Create'
             
             decoded_instructions.append({
                 'name': instruction_name,
                 'programId': program_id,
                 'data': bytes(ix.data).hex(),
-                'accounts': [str(account_keys[acc_idx]) for acc_idx in ix.accounts]
+                'accounts': [account_key_strs[acc_idx] for acc_idx in ix.accounts]
             })
 
     return decoded_instructions
@@ -124,9 +133,12 @@ if len(sys.argv) != 2:
     print("Usage: python decode_fromBlock.py <transaction_file_path>")
     sys.exit(1)
 
+logging.basicConfig(level=logging.INFO)
+
 tx_file_path = sys.argv[1]
 idl = load_idl('../idl/pump_fun_idl.json')
+discriminator_table = build_discriminator_table(idl)
 tx_data = load_transaction(tx_file_path)
 
-decoded_instructions = decode_transaction(tx_data, idl)
-print(json.dumps(decoded_instructions, indent=2))
\ No newline at end of file
+decoded_instructions = decode_transaction(tx_data, idl, discriminator_table)
+print(orjson.dumps(decoded_instructions, option=orjson.OPT_INDENT_2).decode())
\ No newline at end of file
@@ -1,25 +1,44 @@
-import json
-import base64
+import orjson
+import binascii
 import struct
-from construct import Struct, Int64ul, Flag
+from solders.pubkey import Pubkey
 
 LAMPORTS_PER_SOL = 1_000_000_000
 TOKEN_DECIMALS = 6
 EXPECTED_DISCRIMINATOR = struct.pack("<Q", 6966180631402821399)
 
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_LAYOUT_V1 = struct.Struct("<QQQQQ?")
+_CREATOR_OFFSET = 8 + _LAYOUT_V1.size
+
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
+        "creator",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
+        """
+        Expects raw account data whose discriminator was already checked by the caller
+        """
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _LAYOUT_V1.unpack_from(data, 8)
+        # v2 curve accounts also store the creator right after the reserves
+        if len(data) >= _CREATOR_OFFSET + 32:
+            self.creator = Pubkey.from_bytes(data[_CREATOR_OFFSET:_CREATOR_OFFSET + 32])
+        else:
+            self.creator = None
 
 def calculate_bonding_curve_price(curve_state: BondingCurveState) -> float:
     if curve_state.virtual_token_reserves <= 0 or curve_state.virtual_sol_reserves <= 0:
@@ -28,14 +47,15 @@ def calculate_bonding_curve_price(curve_state: BondingCurveState) -> float:
     return (curve_state.virtual_sol_reserves / LAMPORTS_PER_SOL) / (curve_state.virtual_token_reserves / 10 ** TOKEN_DECIMALS)
 
 def decode_bonding_curve_data(raw_data: str) -> BondingCurveState:
-    decoded_data = base64.b64decode(raw_data)
-    if decoded_data[:8] != EXPECTED_DISCRIMINATOR:
+    # Skips the argument normalization b64decode does before calling the same C decoder
+    decoded_data = binascii.a2b_base64(raw_data)
+    if not decoded_data.startswith(EXPECTED_DISCRIMINATOR):
         raise ValueError("Invalid curve state discriminator")
     return BondingCurveState(decoded_data)
 
 # Load the JSON data
-with open('raw_bondingCurve_from_getAccountInfo.json', 'r') as file:
-    json_data = json.load(file)
+with open('raw_bondingCurve_from_getAccountInfo.json', 'rb') as file:
+    json_data = orjson.loads(file.read())
 
 # Extract the base64 encoded data
 encoded_data = json_data['result']['value']['data'][0]
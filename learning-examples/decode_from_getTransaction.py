@@ -1,11 +1,18 @@
-import json
-import base58
+import orjson
+try:
+    # Rust bs58 bindings, much faster than the pure-Python base58 package
+    from based58 import b58decode
+except ImportError:
+    from base58 import b58decode
 from solana.transaction import Transaction
 from solders.pubkey import Pubkey
 import struct
 import sys
 import base64
 
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
 import sys
 
 if len(sys.argv) != 2:
@@ -15,24 +22,24 @@ if len(sys.argv) != 2:
 tx_file_path = sys.argv[1]
 
 # Load the IDL
-with open('../idl/pump_fun_idl.json', 'r') as f:
-    idl = json.load(f)
+with open('../idl/pump_fun_idl.json', 'rb') as f:
+    idl = orjson.loads(f.read())
 
 # Load the transaction log
-with open(tx_file_path, 'r') as f:
-    tx_log = json.load(f)
+with open(tx_file_path, 'rb') as f:
+    tx_log = orjson.loads(f.read())
 
 # Extract the transaction data
 tx_data = tx_log['result']['transaction']
 
-print(json.dumps(tx_data, indent=2))
+print(orjson.dumps(tx_data, option=orjson.OPT_INDENT_2).decode())
 
 def decode_create_instruction(data):
     # The Create instruction has 3 string arguments: name, symbol, uri
     offset = 8  # Skip the 8-byte discriminator
     results = []
     for _ in range(3):
-        length = struct.unpack_from("<I", data, offset)[0]
+        length = _U32.unpack_from(data, offset)[0]
         offset += 4
         string_data = data[offset:offset+length].decode('utf-8')
         results.append(string_data)
@@ -45,7 +52,7 @@ def decode_create_instruction(data):
 
 def decode_buy_instruction(data):
     # Assuming the buy instruction has a u64 argument for amount
-    amount = struct.unpack_from("<Q", data, 8)[0]
+    amount = _U64.unpack_from(data, 8)[0]
     return {"amount": amount}
 
 def decode_instruction_data(instruction, accounts, data):
@@ -76,11 +83,11 @@ for ix in instructions:
     
     if 'parsed' in ix:
         print(f"Parsed instruction: {ix['program']} - {ix['parsed']['type']}")
-        print(f"Info: {json.dumps(ix['parsed']['info'], indent=2)}")
+        print(f"Info: {orjson.dumps(ix['parsed']['info'], option=orjson.OPT_INDENT_2).decode()}")
     elif program_id == idl['metadata']['address']:
         matching_instruction = find_matching_instruction(accounts, data)
         if matching_instruction:
-            decoded_data = decode_instruction_data(matching_instruction, accounts, base58.b58decode(data))
+            decoded_data = decode_instruction_data(matching_instruction, accounts, b58decode(data.encode()))
             print(f"Instruction: {matching_instruction['name']}")
             print(f"Decoded data: {decoded_data}")
             
@@ -4,44 +4,69 @@ import sys
 import os
 from typing import Final
 
-from construct import Struct, Int64ul, Flag
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import RPC_ENDPOINT
+from config import CFG
 
 LAMPORTS_PER_SOL: Final[int] = 1_000_000_000
 TOKEN_DECIMALS: Final[int] = 6
-CURVE_ADDRESS: Final[str] = "6GXfUqrmPM4VdN1NoDZsE155jzRegJngZRjMkGyby7do"
+CURVE_ADDRESSES: Final[list[str]] = [
+    "6GXfUqrmPM4VdN1NoDZsE155jzRegJngZRjMkGyby7do",
+]
+# Seconds between price updates
+POLL_INTERVAL: Final[int] = 5
+# getMultipleAccounts accepts at most 100 addresses per request
+MAX_ACCOUNTS_PER_REQUEST: Final[int] = 100
 
 # Here and later all the discriminators are precalculated. See learning-examples/discriminator.py
 EXPECTED_DISCRIMINATOR: Final[bytes] = struct.pack("<Q", 6966180631402821399)
 
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_LAYOUT_V1 = struct.Struct("<QQQQQ?")
+_CREATOR_OFFSET = 8 + _LAYOUT_V1.size
+
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
+        "creator",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
-
-async def get_bonding_curve_state(conn: AsyncClient, curve_address: Pubkey) -> BondingCurveState:
-    response = await conn.get_account_info(curve_address)
-    if not response.value or not response.value.data:
-        raise ValueError("Invalid curve state: No data")
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _LAYOUT_V1.unpack_from(data, 8)
+        if len(data) >= _CREATOR_OFFSET + 32:
+            self.creator = Pubkey.from_bytes(data[_CREATOR_OFFSET:_CREATOR_OFFSET + 32])
+        else:
+            self.creator = None
 
-    data = response.value.data
-    if data[:8] != EXPECTED_DISCRIMINATOR:
-        raise ValueError("Invalid curve state discriminator")
-
-    return BondingCurveState(data)
+async def get_bonding_curve_states(conn: AsyncClient, curve_addresses: list[Pubkey]) -> list[BondingCurveState | None]:
+    """
+    Fetches many curves with one getMultipleAccounts per 100 addresses instead of one request per curve.
+    Curves that don't exist or have an unexpected discriminator come back as None
+    """
+    responses = await asyncio.gather(*(
+        conn.get_multiple_accounts(curve_addresses[i:i + MAX_ACCOUNTS_PER_REQUEST], encoding="base64")
+        for i in range(0, len(curve_addresses), MAX_ACCOUNTS_PER_REQUEST)
+    ))
+    return [
+        BondingCurveState(account.data)
+        if account is not None and account.data.startswith(EXPECTED_DISCRIMINATOR) else None
+        for response in responses
+        for account in response.value
+    ]
 
 def calculate_bonding_curve_price(curve_state: BondingCurveState) -> float:
     if curve_state.virtual_token_reserves <= 0 or curve_state.virtual_sol_reserves <= 0:
@@ -50,18 +75,28 @@ def calculate_bonding_curve_price(curve_state: BondingCurveState) -> float:
     return (curve_state.virtual_sol_reserves / LAMPORTS_PER_SOL) / (curve_state.virtual_token_reserves / 10 ** TOKEN_DECIMALS)
 
 async def main() -> None:
-    try:
-        async with AsyncClient(RPC_ENDPOINT) as conn:
-            curve_address = Pubkey.from_string(CURVE_ADDRESS)
-            bonding_curve_state = await get_bonding_curve_state(conn, curve_address)
-            token_price_sol = calculate_bonding_curve_price(bonding_curve_state)
+    # One client for the whole run, every poll reuses its keep-alive connection
+    async with AsyncClient(CFG.RPC_ENDPOINT) as conn:
+        curve_addresses = [Pubkey.from_string(address) for address in CURVE_ADDRESSES]
+        while True:
+            try:
+                states = await get_bonding_curve_states(conn, curve_addresses)
+
+                print("Token prices:")
+                for curve_address, bonding_curve_state in zip(curve_addresses, states):
+                    if bonding_curve_state is None:
+                        print(f"  {curve_address}: invalid curve state")
+                        continue
+                    try:
+                        token_price_sol = calculate_bonding_curve_price(bonding_curve_state)
+                    except ValueError as e:
+                        print(f"  {curve_address}: {e}")
+                        continue
+                    print(f"  {curve_address}: {token_price_sol:.10f} SOL")
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
 
-            print("Token price:")
-            print(f"  {token_price_sol:.10f} SOL")
-    except ValueError as e:
-        print(f"Error: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -10,7 +10,10 @@ from solders.transaction import VersionedTransaction
 from solders.pubkey import Pubkey
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import WSS_ENDPOINT, PUMP_PROGRAM
+from config import CFG, PUMP_PROGRAM
+
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
 
 def load_idl(file_path):
     with open(file_path, 'r') as f:
@@ -22,7 +25,7 @@ def decode_create_instruction(ix_data, ix_def, accounts):
 
     for arg in ix_def['args']:
         if arg['type'] == 'string':
-            length = struct.unpack_from('<I', ix_data, offset)[0]
+            length = _U32.unpack_from(ix_data, offset)[0]
             offset += 4
             value = ix_data[offset:offset+length].decode('utf-8')
             offset += length
@@ -46,8 +49,9 @@ def decode_create_instruction(ix_data, ix_def, accounts):
 async def listen_and_decode_create():
     idl = load_idl('../idl/pump_fun_idl.json')
     create_discriminator = 8576854823835016728
+    create_discriminator_bytes = _U64.pack(create_discriminator)
     
-    async with websockets.connect(WSS_ENDPOINT) as websocket:
+    async with websockets.connect(CFG.WSS_ENDPOINT) as websocket:
         subscription_message = json.dumps({
             "jsonrpc": "2.0",
             "id": 1,
@@ -80,14 +84,15 @@ async def listen_and_decode_create():
                                 for tx in block['transactions']:
                                     if isinstance(tx, dict) and 'transaction' in tx:
                                         tx_data_decoded = base64.b64decode(tx['transaction'][0])
+                                        if create_discriminator_bytes not in tx_data_decoded:
+                                            continue
                                         transaction = VersionedTransaction.from_bytes(tx_data_decoded)
                                         
                                         for ix in transaction.message.instructions:
-                                            if str(transaction.message.account_keys[ix.program_id_index]) == str(PUMP_PROGRAM):
+                                            if transaction.message.account_keys[ix.program_id_index] == PUMP_PROGRAM:
                                                 ix_data = bytes(ix.data)
-                                                discriminator = struct.unpack('<Q', ix_data[:8])[0]
                                                 
-                                                if discriminator == create_discriminator:
+                                                if ix_data.startswith(create_discriminator_bytes):
                                                     create_ix = next(instr for instr in idl['instructions'] if instr['name'] == 'create')
                                                     account_keys = [str(transaction.message.account_keys[index]) for index in ix.accounts]
                                                     decoded_args = decode_create_instruction(ix_data, create_ix, account_keys)
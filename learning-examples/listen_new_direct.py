@@ -3,12 +3,12 @@ import json
 import websockets
 import base58
 import base64
-import struct
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import WSS_ENDPOINT, PUMP_PROGRAM
+from config import CFG, PUMP_PROGRAM
+from utils import read_public_key, read_string
 
 # Load the IDL JSON file
 with open('../idl/pump_fun_idl.json', 'r') as f:
@@ -17,34 +17,32 @@ with open('../idl/pump_fun_idl.json', 'r') as f:
 # Extract the "create" instruction definition
 create_instruction = next(instr for instr in idl['instructions'] if instr['name'] == 'create')
 
+PROGRAM_DATA_PREFIX = "Program data: "
+
+def _read_public_key(view, offset):
+    public_key, offset = read_public_key(view, offset)
+    return str(public_key), offset
+
+_CREATE_EVENT_FIELDS = (
+    ('name', read_string),
+    ('symbol', read_string),
+    ('uri', read_string),
+    ('mint', _read_public_key),
+    ('bondingCurve', _read_public_key),
+    ('user', _read_public_key),
+)
+
 def parse_create_instruction(data):
     if len(data) < 8:
         return None
     offset = 8
     parsed_data = {}
 
-    # Parse fields based on CreateEvent structure
-    fields = [
-        ('name', 'string'),
-        ('symbol', 'string'),
-        ('uri', 'string'),
-        ('mint', 'publicKey'),
-        ('bondingCurve', 'publicKey'),
-        ('user', 'publicKey'),
-    ]
+    view = memoryview(data)
 
     try:
-        for field_name, field_type in fields:
-            if field_type == 'string':
-                length = struct.unpack('<I', data[offset:offset+4])[0]
-                offset += 4
-                value = data[offset:offset+length].decode('utf-8')
-                offset += length
-            elif field_type == 'publicKey':
-                value = base58.b58encode(data[offset:offset+32]).decode('utf-8')
-                offset += 32
-
-            parsed_data[field_name] = value
+        for field_name, read in _CREATE_EVENT_FIELDS:
+            parsed_data[field_name], offset = read(view, offset)
 
         return parsed_data
     except:
@@ -54,9 +52,9 @@ def print_transaction_details(log_data):
     print(f"Signature: {log_data.get('signature')}")
     
     for log in log_data.get('logs', []):
-        if log.startswith("Program data:"):
+        if log.startswith(PROGRAM_DATA_PREFIX):
             try:
-                data = base58.b58decode(log.split(": ")[1]).decode('utf-8')
+                data = base58.b58decode(log[len(PROGRAM_DATA_PREFIX):]).decode('utf-8')
                 print(f"Data: {data}")
             except:
                 pass
@@ -64,7 +62,7 @@ def print_transaction_details(log_data):
 async def listen_for_new_tokens():
     while True:
         try:
-            async with websockets.connect(WSS_ENDPOINT) as websocket:
+            async with websockets.connect(CFG.WSS_ENDPOINT) as websocket:
                 subscription_message = json.dumps({
                     "jsonrpc": "2.0",
                     "id": 1,
@@ -92,9 +90,9 @@ async def listen_for_new_tokens():
                             
                             if any("Program log: Instruction: Create" in log for log in logs):
                                 for log in logs:
-                                    if "Program data:" in log:
+                                    if log.startswith(PROGRAM_DATA_PREFIX):
                                         try:
-                                            encoded_data = log.split(": ")[1]
+                                            encoded_data = log[len(PROGRAM_DATA_PREFIX):]
                                             decoded_data = base64.b64decode(encoded_data)
                                             parsed_data = parse_create_instruction(decoded_data)
                                             if parsed_data and 'name' in parsed_data:
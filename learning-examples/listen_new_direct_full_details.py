@@ -3,18 +3,21 @@ import json
 import websockets
 import base58
 import base64
-import struct
 import sys
 import os
 from solders.pubkey import Pubkey
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config import (
-    WSS_ENDPOINT, 
+    CFG,
     PUMP_PROGRAM,
     SYSTEM_TOKEN_PROGRAM as TOKEN_PROGRAM_ID,
     SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM as ATA_PROGRAM_ID
 )
+from utils import read_public_key, read_string
+
+# Converted once instead of on every derivation
+_TOKEN_PROGRAM_BYTES = bytes(TOKEN_PROGRAM_ID)
 
 def find_associated_bonding_curve(mint: Pubkey, bonding_curve: Pubkey) -> Pubkey:
     """
@@ -24,7 +27,7 @@ def find_associated_bonding_curve(mint: Pubkey, bonding_curve: Pubkey) -> Pubkey
     derived_address, _ = Pubkey.find_program_address(
         [
             bytes(bonding_curve),
-            bytes(TOKEN_PROGRAM_ID),
+            _TOKEN_PROGRAM_BYTES,
             bytes(mint),
         ],
         ATA_PROGRAM_ID
@@ -38,34 +41,29 @@ with open('../idl/pump_fun_idl.json', 'r') as f:
 # Extract the "create" instruction definition
 create_instruction = next(instr for instr in idl['instructions'] if instr['name'] == 'create')
 
+PROGRAM_DATA_PREFIX = "Program data: "
+
+# Kept as Pubkeys: printing formats them anyway, and the listener derives addresses from them
+_CREATE_EVENT_FIELDS = (
+    ('name', read_string),
+    ('symbol', read_string),
+    ('uri', read_string),
+    ('mint', read_public_key),
+    ('bondingCurve', read_public_key),
+    ('user', read_public_key),
+)
+
 def parse_create_instruction(data):
     if len(data) < 8:
         return None
     offset = 8
     parsed_data = {}
 
-    # Parse fields based on CreateEvent structure
-    fields = [
-        ('name', 'string'),
-        ('symbol', 'string'),
-        ('uri', 'string'),
-        ('mint', 'publicKey'),
-        ('bondingCurve', 'publicKey'),
-        ('user', 'publicKey'),
-    ]
+    view = memoryview(data)
 
     try:
-        for field_name, field_type in fields:
-            if field_type == 'string':
-                length = struct.unpack('<I', data[offset:offset+4])[0]
-                offset += 4
-                value = data[offset:offset+length].decode('utf-8')
-                offset += length
-            elif field_type == 'publicKey':
-                value = base58.b58encode(data[offset:offset+32]).decode('utf-8')
-                offset += 32
-
-            parsed_data[field_name] = value
+        for field_name, read in _CREATE_EVENT_FIELDS:
+            parsed_data[field_name], offset = read(view, offset)
 
         return parsed_data
     except:
@@ -75,9 +73,9 @@ def print_transaction_details(log_data):
     print(f"Signature: {log_data.get('signature')}")
     
     for log in log_data.get('logs', []):
-        if log.startswith("Program data:"):
+        if log.startswith(PROGRAM_DATA_PREFIX):
             try:
-                data = base58.b58decode(log.split(": ")[1]).decode('utf-8')
+                data = base58.b58decode(log[len(PROGRAM_DATA_PREFIX):]).decode('utf-8')
                 print(f"Data: {data}")
             except:
                 pass
@@ -85,7 +83,7 @@ def print_transaction_details(log_data):
 async def listen_for_new_tokens():
     while True:
         try:
-            async with websockets.connect(WSS_ENDPOINT) as websocket:
+            async with websockets.connect(CFG.WSS_ENDPOINT) as websocket:
                 subscription_message = json.dumps({
                     "jsonrpc": "2.0",
                     "id": 1,
@@ -113,9 +111,9 @@ async def listen_for_new_tokens():
                             
                             if any("Program log: Instruction: Create" in log for log in logs):
                                 for log in logs:
-                                    if "Program data:" in log:
+                                    if log.startswith(PROGRAM_DATA_PREFIX):
                                         try:
-                                            encoded_data = log.split(": ")[1]
+                                            encoded_data = log[len(PROGRAM_DATA_PREFIX):]
                                             decoded_data = base64.b64decode(encoded_data)
                                             parsed_data = parse_create_instruction(decoded_data)
                                             if parsed_data and 'name' in parsed_data:
@@ -124,9 +122,7 @@ async def listen_for_new_tokens():
                                                     print(f"{key}: {value}")
                                                 
                                                 # Calculate associated bonding curve
-                                                mint = Pubkey.from_string(parsed_data['mint'])
-                                                bonding_curve = Pubkey.from_string(parsed_data['bondingCurve'])
-                                                associated_curve = find_associated_bonding_curve(mint, bonding_curve)
+                                                associated_curve = find_associated_bonding_curve(parsed_data['mint'], parsed_data['bondingCurve'])
                                                 print(f"Associated Bonding Curve: {associated_curve}")
                                                 print("##########################################################################################")
                                         except Exception as e:
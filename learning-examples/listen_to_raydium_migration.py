@@ -1,13 +1,39 @@
 import websockets
 import asyncio
-import json
+import orjson
 import base64
 from solders.pubkey import Pubkey
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import WSS_ENDPOINT, PUMP_LIQUIDITY_MIGRATOR
+from config import (
+    CFG,
+    PUMP_LIQUIDITY_MIGRATOR,
+    WSS_COMPRESSION,
+    WSS_MAX_SIZE,
+    WSS_PING_INTERVAL,
+    WSS_PING_TIMEOUT,
+)
+from buy import install_event_loop
+
+INITIALIZE2_LOG = "Program log: initialize2: InitializeInstruction2"
+
+SUBSCRIPTION_MESSAGE = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "blockSubscribe",
+    "params": [
+        {"mentionsAccountOrProgram": str(PUMP_LIQUIDITY_MIGRATOR)},
+        {
+            "commitment": "confirmed",
+            "encoding": "json",
+            "showRewards": False,
+            "transactionDetails": "full",
+            "maxSupportedTransactionVersion": 0
+        }
+    ]
+}).decode()
 
 def process_initialize2_transaction(data):
     """Process and decode an initialize2 transaction"""
@@ -22,10 +48,13 @@ def process_initialize2_transaction(data):
             token_address = account_keys[18]
             liquidity_address = account_keys[2]
             
-            print(f"\nSignature: {signature}")
-            print(f"Token Address: {token_address}")
-            print(f"Liquidity Address: {liquidity_address}")
-            print("=" * 50)
+            # One write per event instead of one per line
+            print(
+                f"\nSignature: {signature}\n"
+                f"Token Address: {token_address}\n"
+                f"Liquidity Address: {liquidity_address}\n"
+                + "=" * 50
+            )
         else:
             print(f"\nError: Not enough account keys (found {len(account_keys)})")
         
@@ -35,58 +64,46 @@ def process_initialize2_transaction(data):
 async def listen_for_events():
     while True:
         try:
-            async with websockets.connect(WSS_ENDPOINT) as websocket:
-                subscription_message = json.dumps({
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "blockSubscribe",
-                    "params": [
-                        {"mentionsAccountOrProgram": str(PUMP_LIQUIDITY_MIGRATOR)},
-                        {
-                            "commitment": "confirmed",
-                            "encoding": "json",
-                            "showRewards": False,
-                            "transactionDetails": "full",
-                            "maxSupportedTransactionVersion": 0
-                        }
-                    ]
-                })
-                
-                await websocket.send(subscription_message)
+            async with websockets.connect(
+                CFG.WSS_ENDPOINT,
+                ping_interval=WSS_PING_INTERVAL,
+                ping_timeout=WSS_PING_TIMEOUT,
+                max_size=WSS_MAX_SIZE,
+                compression=WSS_COMPRESSION,
+            ) as websocket:
+                await websocket.send(SUBSCRIPTION_MESSAGE)
                 response = await websocket.recv()
                 print(f"Subscription response: {response}")
                 print("\nListening for Raydium pool initialization events...")
 
-                while True:
-                    try:
-                        response = await asyncio.wait_for(websocket.recv(), timeout=30)
-                        data = json.loads(response)
-                        
-                        if 'method' in data and data['method'] == 'blockNotification':
-                            if 'params' in data and 'result' in data['params']:
-                                block_data = data['params']['result']
-                                if 'value' in block_data and 'block' in block_data['value']:
-                                    block = block_data['value']['block']
-                                    if 'transactions' in block:
-                                        for tx in block['transactions']:
-                                            logs = tx.get('meta', {}).get('logMessages', [])
-                                            
-                                            # Check for initialize2 instruction
-                                            for log in logs:
-                                                if "Program log: initialize2: InitializeInstruction2" in log:
-                                                    print("Found initialize2 instruction!")
-                                                    process_initialize2_transaction(tx)
-                                                    break
-                                        
-                    except asyncio.TimeoutError:
-                        print("\nChecking connection...")
-                        print("Connection alive")
+                # Dead connections are detected by the library's pings, the iterator then raises and we reconnect
+                async for response in websocket:
+                    # Most blocks have no pool initialization, a substring search skips them before the JSON decode
+                    if INITIALIZE2_LOG not in response:
                         continue
-                        
+                    data = orjson.loads(response)
+                    
+                    if 'method' in data and data['method'] == 'blockNotification':
+                        if 'params' in data and 'result' in data['params']:
+                            block_data = data['params']['result']
+                            if 'value' in block_data and 'block' in block_data['value']:
+                                block = block_data['value']['block']
+                                if 'transactions' in block:
+                                    for tx in block['transactions']:
+                                        logs = tx.get('meta', {}).get('logMessages', [])
+                                        
+                                        # Check for initialize2 instruction
+                                        for log in logs:
+                                            if INITIALIZE2_LOG in log:
+                                                print("Found initialize2 instruction!")
+                                                process_initialize2_transaction(tx)
+                                                break
+
         except Exception as e:
             print(f"\nConnection error: {str(e)}")
             print("Retrying in 5 seconds...")
             await asyncio.sleep(5)
 
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(listen_for_events())
\ No newline at end of file
@@ -4,6 +4,7 @@ import base64
 import struct
 import base58
 import os
+import httpx
 
 from solana.transaction import Message
 from solana.rpc.async_api import AsyncClient
@@ -17,17 +18,23 @@ from solders.system_program import TransferParams, transfer
 from solders.transaction import VersionedTransaction, Transaction
 from solders.compute_budget import set_compute_unit_price
 
-import spl.token.instructions as spl_token
 from spl.token.instructions import get_associated_token_address
 
 import websockets
 import hashlib
-from construct import Struct, Int64ul, Flag
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from buy import create_idempotent_associated_token_account
+from utils import create_rpc_client
 
 # Here and later all the discriminators are precalculated. See learning-examples/discriminator.py
 EXPECTED_DISCRIMINATOR = struct.pack("<Q", 6966180631402821399)
 TOKEN_DECIMALS = 6
 
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
 # Global constants
 PUMP_PROGRAM = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
 PUMP_GLOBAL = Pubkey.from_string("4wTV1YmiEkRvAtNtsSGPtUrqRYQMe5SKy2uB4Jjaxnjf")
@@ -43,20 +50,31 @@ LAMPORTS_PER_SOL = 1_000_000_000
 # RPC ENDPOINTS
 RPC_ENDPOINT = "ENTER_YOUR_CHAINSTACK_HTTP_ENDPOINT"
 RPC_WEBSOCKET = "ENTER_YOUR_CHAINSTACK_WS_ENDPOINT"
+RPC_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60)
+
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_UNPACK_BONDING_CURVE = struct.Struct("<QQQQQ?").unpack_from
 
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
+        # All six fields come out of a single precompiled unpack
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _UNPACK_BONDING_CURVE(data, 8)
 
 async def get_pump_curve_state(conn: AsyncClient, curve_address: Pubkey) -> BondingCurveState:
     response = await conn.get_account_info(curve_address)
@@ -64,7 +82,7 @@ async def get_pump_curve_state(conn: AsyncClient, curve_address: Pubkey) -> Bond
         raise ValueError("Invalid curve state: No data")
 
     data = response.value.data
-    if data[:8] != EXPECTED_DISCRIMINATOR:
+    if not data.startswith(EXPECTED_DISCRIMINATOR):
         raise ValueError("Invalid curve state discriminator")
 
     return BondingCurveState(data)
@@ -75,101 +93,70 @@ def calculate_pump_curve_price(curve_state: BondingCurveState) -> float:
 
     return (curve_state.virtual_sol_reserves / LAMPORTS_PER_SOL) / (curve_state.virtual_token_reserves / 10 ** TOKEN_DECIMALS)
 
-async def buy_token(mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, amount: float, slippage: float = 0.25, max_retries=5):
+async def buy_token(client: AsyncClient, mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, amount: float, slippage: float = 0.25, max_retries=5):
     private_key = base58.b58decode("ENTER_PRIVATE_KEY")
     payer = Keypair.from_bytes(private_key)
 
-    async with AsyncClient(RPC_ENDPOINT) as client:
-        associated_token_account = get_associated_token_address(payer.pubkey(), mint)
-        amount_lamports = int(amount * LAMPORTS_PER_SOL)
+    associated_token_account = get_associated_token_address(payer.pubkey(), mint)
+    amount_lamports = int(amount * LAMPORTS_PER_SOL)
 
-        # Fetch the token price
-        curve_state = await get_pump_curve_state(client, bonding_curve)
-        token_price_sol = calculate_pump_curve_price(curve_state)
-        token_amount = amount / token_price_sol
-
-        # Calculate maximum SOL to spend with slippage
-        max_amount_lamports = int(amount_lamports * (1 + slippage))
-
-        # Create associated token account with retries
-        for ata_attempt in range(max_retries):
-            try:
-                account_info = await client.get_account_info(associated_token_account)
-                if account_info.value is None:
-                    print(f"Creating associated token account (Attempt {ata_attempt + 1})...")
-                    create_ata_ix = spl_token.create_associated_token_account(
-                        payer=payer.pubkey(),
-                        owner=payer.pubkey(),
-                        mint=mint
-                    )
-
-                    msg = Message([create_ata_ix], payer.pubkey())
-                    tx_ata = await client.send_transaction(
-                        Transaction([payer], msg, (await client.get_latest_blockhash()).value.blockhash),
-                        opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed)
-                        )
-                    
-                    await client.confirm_transaction(tx_ata.value, commitment="confirmed")
-
-                    print("Associated token account created.")
-                    print(f"Associated token account address: {associated_token_account}")
-                    break
-                else:
-                    print("Associated token account already exists.")
-                    print(f"Associated token account address: {associated_token_account}")
-                    break
-            except Exception as e:
-                print(f"Attempt {ata_attempt + 1} to create associated token account failed: {str(e)}")
-                if ata_attempt < max_retries - 1:
-                    wait_time = 2 ** ata_attempt
-                    print(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    print("Max retries reached. Unable to create associated token account.")
-                    return
-
-        # Continue with the buy transaction
-        for attempt in range(max_retries):
-            try:
-                accounts = [
-                    AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=payer.pubkey(), is_signer=True, is_writable=True),
-                    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_RENT, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
-                ]
-
-                discriminator = struct.pack("<Q", 16927863322537952870)
-                data = discriminator + struct.pack("<Q", int(token_amount * 10**6)) + struct.pack("<Q", max_amount_lamports)
-                buy_ix = Instruction(PUMP_PROGRAM, data, accounts)
-
-                msg = Message([set_compute_unit_price(1_000), buy_ix], payer.pubkey())
-                tx_buy = await client.send_transaction(
-                    Transaction([payer], msg, (await client.get_latest_blockhash()).value.blockhash),
-                    opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed)
-                    )
-
-                print(f"Transaction sent: https://explorer.solana.com/tx/{tx_buy.value}")
-
-                await client.confirm_transaction(tx_buy.value, commitment="confirmed")
-                print("Transaction confirmed")
-                return  # Success, exit the function
-
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)[:50]}")
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    print("Max retries reached. Unable to complete the transaction.")
+    # Fetch the token price
+    curve_state = await get_pump_curve_state(client, bonding_curve)
+    token_price_sol = calculate_pump_curve_price(curve_state)
+    token_amount = amount / token_price_sol
+
+    # Calculate maximum SOL to spend with slippage
+    max_amount_lamports = int(amount_lamports * (1 + slippage))
+
+    # CreateIdempotent succeeds when the account already exists, so it always goes in with the buy
+    instructions = [
+        set_compute_unit_price(1_000),
+        create_idempotent_associated_token_account(payer.pubkey(), payer.pubkey(), mint),
+    ]
+    print(f"Associated token account address: {associated_token_account}")
+
+    # Continue with the buy transaction
+    for attempt in range(max_retries):
+        try:
+            accounts = [
+                AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=payer.pubkey(), is_signer=True, is_writable=True),
+                AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=SYSTEM_RENT, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
+            ]
+
+            discriminator = struct.pack("<Q", 16927863322537952870)
+            data = discriminator + struct.pack("<Q", int(token_amount * 10**6)) + struct.pack("<Q", max_amount_lamports)
+            buy_ix = Instruction(PUMP_PROGRAM, data, accounts)
+
+            msg = Message([*instructions, buy_ix], payer.pubkey())
+            tx_buy = await client.send_transaction(
+                Transaction([payer], msg, (await client.get_latest_blockhash()).value.blockhash),
+                opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed)
+                )
+
+            print(f"Transaction sent: https://explorer.solana.com/tx/{tx_buy.value}")
+
+            await client.confirm_transaction(tx_buy.value, commitment="confirmed")
+            print("Transaction confirmed")
+            return  # Success, exit the function
+
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed: {str(e)[:50]}")
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt
+                print(f"Retrying in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+            else:
+                print("Max retries reached. Unable to complete the transaction.")
 
 def load_idl(file_path):
     with open(file_path, 'r') as f:
@@ -178,7 +165,7 @@ def load_idl(file_path):
 def calculate_discriminator(instruction_name):
     sha = hashlib.sha256()
     sha.update(instruction_name.encode('utf-8'))
-    return struct.unpack('<Q', sha.digest()[:8])[0]
+    return _U64.unpack_from(sha.digest())[0]
 
 def decode_create_instruction(ix_data, ix_def, accounts):
     args = {}
@@ -186,7 +173,7 @@ def decode_create_instruction(ix_data, ix_def, accounts):
 
     for arg in ix_def['args']:
         if arg['type'] == 'string':
-            length = struct.unpack_from('<I', ix_data, offset)[0]
+            length = _U32.unpack_from(ix_data, offset)[0]
             offset += 4
             value = ix_data[offset:offset+length].decode('utf-8')
             offset += length
@@ -210,6 +197,7 @@ async def listen_for_create_transaction():
     idl_path = os.path.join(os.path.dirname(__file__), '..', 'idl', 'pump_fun_idl.json')
     idl = load_idl(idl_path)
     create_discriminator = calculate_discriminator("global:create")
+    create_discriminator_bytes = _U64.pack(create_discriminator)
     
     async with websockets.connect(RPC_WEBSOCKET) as websocket:
         subscription_message = json.dumps({
@@ -243,14 +231,16 @@ async def listen_for_create_transaction():
                             for tx in block['transactions']:
                                 if isinstance(tx, dict) and 'transaction' in tx:
                                     tx_data_decoded = base64.b64decode(tx['transaction'][0])
+                                    # Skip the full deserialization when the Create discriminator isn't anywhere in the raw bytes
+                                    if create_discriminator_bytes not in tx_data_decoded:
+                                        continue
                                     transaction = VersionedTransaction.from_bytes(tx_data_decoded)
                                     
                                     for ix in transaction.message.instructions:
-                                        if str(transaction.message.account_keys[ix.program_id_index]) == str(PUMP_PROGRAM):
+                                        if transaction.message.account_keys[ix.program_id_index] == PUMP_PROGRAM:
                                             ix_data = bytes(ix.data)
-                                            discriminator = struct.unpack('<Q', ix_data[:8])[0]
                                             
-                                            if discriminator == create_discriminator:
+                                            if ix_data.startswith(create_discriminator_bytes):
                                                 create_ix = next(instr for instr in idl['instructions'] if instr['name'] == 'create')
                                                 account_keys = [str(transaction.message.account_keys[index]) for index in ix.accounts]
                                                 decoded_args = decode_create_instruction(ix_data, create_ix, account_keys)
@@ -270,19 +260,19 @@ async def main():
     bonding_curve = Pubkey.from_string(token_data['bondingCurve'])
     associated_bonding_curve = Pubkey.from_string(token_data['associatedBondingCurve'])
 
-    # Fetch the token price
-    async with AsyncClient(RPC_ENDPOINT) as client:
+    async with await create_rpc_client(RPC_ENDPOINT, RPC_HTTP_LIMITS) as client:
+        # Fetch the token price
         curve_state = await get_pump_curve_state(client, bonding_curve)
         token_price_sol = calculate_pump_curve_price(curve_state)
 
-    # Amount of SOL to spend (adjust as needed)
-    amount = 0.00001  # 0.00001 SOL
-    slippage = 0.3  # 30% slippage tolerance
+        # Amount of SOL to spend (adjust as needed)
+        amount = 0.00001  # 0.00001 SOL
+        slippage = 0.3  # 30% slippage tolerance
 
-    print(f"Bonding curve address: {bonding_curve}")
-    print(f"Token price: {token_price_sol:.10f} SOL")
-    print(f"Buying {amount:.6f} SOL worth of the new token with {slippage*100:.1f}% slippage tolerance...")
-    await buy_token(mint, bonding_curve, associated_bonding_curve, amount, slippage)
+        print(f"Bonding curve address: {bonding_curve}")
+        print(f"Token price: {token_price_sol:.10f} SOL")
+        print(f"Buying {amount:.6f} SOL worth of the new token with {slippage*100:.1f}% slippage tolerance...")
+        await buy_token(client, mint, bonding_curve, associated_bonding_curve, amount, slippage)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
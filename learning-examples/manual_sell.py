@@ -3,6 +3,7 @@ import json
 import base64
 import struct
 import base58
+import httpx
 from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction
 from solana.rpc.commitment import Confirmed
@@ -13,7 +14,11 @@ from solana.rpc.types import TxOpts
 from solders.system_program import TransferParams, transfer
 from spl.token.instructions import get_associated_token_address
 import spl.token.instructions as spl_token
-from construct import Struct, Int64ul, Flag
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import create_rpc_client
 
 # Here and later all the discriminators are precalculated. See learning-examples/discriminator.py
 EXPECTED_DISCRIMINATOR = struct.pack("<Q", 6966180631402821399)
@@ -35,20 +40,30 @@ UNIT_BUDGET = 100_000
 
 # RPC endpoint
 RPC_ENDPOINT = "SOLANA_NODE_RPC_ENDPOINT"
+RPC_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60)
+
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_UNPACK_BONDING_CURVE = struct.Struct("<QQQQQ?").unpack_from
 
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _UNPACK_BONDING_CURVE(data, 8)
 
 async def get_pump_curve_state(conn: AsyncClient, curve_address: Pubkey) -> BondingCurveState:
     response = await conn.get_account_info(curve_address)
@@ -56,7 +71,7 @@ async def get_pump_curve_state(conn: AsyncClient, curve_address: Pubkey) -> Bond
         raise ValueError("Invalid curve state: No data")
 
     data = response.value.data
-    if data[:8] != EXPECTED_DISCRIMINATOR:
+    if not data.startswith(EXPECTED_DISCRIMINATOR):
         raise ValueError("Invalid curve state discriminator")
 
     return BondingCurveState(data)
@@ -73,82 +88,81 @@ async def get_token_balance(conn: AsyncClient, associated_token_account: Pubkey)
         return int(response.value.amount)
     return 0
 
-async def sell_token(mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, slippage: float = 0.25, max_retries=5):
+async def sell_token(client: AsyncClient, mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, slippage: float = 0.25, max_retries=5):
     private_key = base58.b58decode("SOLANA_PRIVATE_KEY")
     payer = Keypair.from_bytes(private_key)
 
-    async with AsyncClient(RPC_ENDPOINT) as client:
-        associated_token_account = get_associated_token_address(payer.pubkey(), mint)
-        
-        # Get token balance
-        token_balance = await get_token_balance(client, associated_token_account)
-        token_balance_decimal = token_balance / 10**TOKEN_DECIMALS
-        print(f"Token balance: {token_balance_decimal}")
-        if token_balance == 0:
-            print("No tokens to sell.")
-            return
-
-        # Fetch the token price
-        curve_state = await get_pump_curve_state(client, bonding_curve)
-        token_price_sol = calculate_pump_curve_price(curve_state)
-        print(f"Price per Token: {token_price_sol:.20f} SOL")
-
-        # Calculate minimum SOL output
-        amount = token_balance
-        min_sol_output = float(token_balance_decimal) * float(token_price_sol)
-        slippage_factor = 1 - slippage
-        min_sol_output = int((min_sol_output * slippage_factor) * LAMPORTS_PER_SOL)
-        
-        print(f"Selling {token_balance_decimal} tokens")
-        print(f"Minimum SOL output: {min_sol_output / LAMPORTS_PER_SOL:.10f} SOL")
-
-        # Continue with the sell transaction
-        for attempt in range(max_retries):
-            try:
-                accounts = [
-                    AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=payer.pubkey(), is_signer=True, is_writable=True),
-                    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
-                ]
-
-                discriminator = struct.pack("<Q", 12502976635542562355)
-                data = discriminator + struct.pack("<Q", amount) + struct.pack("<Q", min_sol_output)
-                sell_ix = Instruction(PUMP_PROGRAM, data, accounts)
-
-                recent_blockhash = await client.get_latest_blockhash()
-                transaction = Transaction()
-                transaction.add(sell_ix)
-                transaction.recent_blockhash = recent_blockhash.value.blockhash
-
-                tx = await client.send_transaction(
-                    transaction,
-                    payer,
-                    opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
-                )
-
-                print(f"Transaction sent: https://explorer.solana.com/tx/{tx.value}")
-
-                await client.confirm_transaction(tx.value, commitment="confirmed")
-                print("Transaction confirmed")
-                return  # Success, exit the function
-
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    print("Max retries reached. Unable to complete the transaction.")
+    associated_token_account = get_associated_token_address(payer.pubkey(), mint)
+    
+    # Get token balance
+    token_balance = await get_token_balance(client, associated_token_account)
+    token_balance_decimal = token_balance / 10**TOKEN_DECIMALS
+    print(f"Token balance: {token_balance_decimal}")
+    if token_balance == 0:
+        print("No tokens to sell.")
+        return
+
+    # Fetch the token price
+    curve_state = await get_pump_curve_state(client, bonding_curve)
+    token_price_sol = calculate_pump_curve_price(curve_state)
+    print(f"Price per Token: {token_price_sol:.20f} SOL")
+
+    # Calculate minimum SOL output
+    amount = token_balance
+    min_sol_output = float(token_balance_decimal) * float(token_price_sol)
+    slippage_factor = 1 - slippage
+    min_sol_output = int((min_sol_output * slippage_factor) * LAMPORTS_PER_SOL)
+    
+    print(f"Selling {token_balance_decimal} tokens")
+    print(f"Minimum SOL output: {min_sol_output / LAMPORTS_PER_SOL:.10f} SOL")
+
+    # Continue with the sell transaction
+    for attempt in range(max_retries):
+        try:
+            accounts = [
+                AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=payer.pubkey(), is_signer=True, is_writable=True),
+                AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+                AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
+            ]
+
+            discriminator = struct.pack("<Q", 12502976635542562355)
+            data = discriminator + struct.pack("<Q", amount) + struct.pack("<Q", min_sol_output)
+            sell_ix = Instruction(PUMP_PROGRAM, data, accounts)
+
+            recent_blockhash = await client.get_latest_blockhash()
+            transaction = Transaction()
+            transaction.add(sell_ix)
+            transaction.recent_blockhash = recent_blockhash.value.blockhash
+
+            tx = await client.send_transaction(
+                transaction,
+                payer,
+                opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
+            )
+
+            print(f"Transaction sent: https://explorer.solana.com/tx/{tx.value}")
+
+            await client.confirm_transaction(tx.value, commitment="confirmed")
+            print("Transaction confirmed")
+            return  # Success, exit the function
+
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed: {str(e)}")
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt  # Exponential backoff
+                print(f"Retrying in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+            else:
+                print("Max retries reached. Unable to complete the transaction.")
 
 async def main():
     # Replace these with the actual values for the token you want to sell
@@ -160,7 +174,8 @@ async def main():
 
     print(f"Bonding curve address: {bonding_curve}")
     print(f"Selling tokens with {slippage*100:.1f}% slippage tolerance...")
-    await sell_token(mint, bonding_curve, associated_bonding_curve, slippage)
+    async with await create_rpc_client(RPC_ENDPOINT, RPC_HTTP_LIMITS) as client:
+        await sell_token(client, mint, bonding_curve, associated_bonding_curve, slippage)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
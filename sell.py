@@ -1,52 +1,81 @@
 import asyncio
-import json
-import base64
 import struct
-import base58
 from typing import Final
 
 from solana.rpc.async_api import AsyncClient
-from solana.transaction import Transaction
 from solana.rpc.commitment import Confirmed
 from solana.rpc.types import TxOpts
 
 from solders.pubkey import Pubkey
-from solders.keypair import Keypair
 from solders.instruction import Instruction, AccountMeta
-from solders.system_program import TransferParams, transfer
+from solders.message import MessageV0
+from solders.transaction import VersionedTransaction
 
 from spl.token.instructions import get_associated_token_address
-import spl.token.instructions as spl_token
 
-from construct import Struct, Int64ul, Flag
-
-from config import *
+from config import (
+    LAMPORTS_PER_SOL,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_FEE,
+    PUMP_GLOBAL,
+    PUMP_PROGRAM,
+    SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+    SYSTEM_PROGRAM,
+    SYSTEM_TOKEN_PROGRAM,
+)
+from utils import get_payer
+from buy import blockhash_cache
 
 # Here and later all the discriminators are precalculated. See learning-examples/discriminator.py
 EXPECTED_DISCRIMINATOR: Final[bytes] = struct.pack("<Q", 6966180631402821399)
+SELL_DISCRIMINATOR: Final[bytes] = struct.pack("<Q", 12502976635542562355)
 TOKEN_DECIMALS: Final[int] = 6
 
+# Accounts of the sell instruction that don't depend on the token or the payer
+_STATIC_SELL_ACCOUNTS_PREFIX: Final[tuple[AccountMeta, ...]] = (
+    AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
+)
+_STATIC_SELL_ACCOUNTS_SUFFIX: Final[tuple[AccountMeta, ...]] = (
+    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+    AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
+)
+
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+_UNPACK_BONDING_CURVE = struct.Struct("<QQQQQ?").unpack_from
+# SPL token account layout: mint (32), owner (32), amount (u64), ...
+_UNPACK_TOKEN_AMOUNT = struct.Struct("<Q").unpack_from
+TOKEN_ACCOUNT_AMOUNT_OFFSET: Final[int] = 64
+
 class BondingCurveState:
-    _STRUCT = Struct(
-        "virtual_token_reserves" / Int64ul,
-        "virtual_sol_reserves" / Int64ul,
-        "real_token_reserves" / Int64ul,
-        "real_sol_reserves" / Int64ul,
-        "token_total_supply" / Int64ul,
-        "complete" / Flag
+    __slots__ = (
+        "virtual_token_reserves",
+        "virtual_sol_reserves",
+        "real_token_reserves",
+        "real_sol_reserves",
+        "token_total_supply",
+        "complete",
     )
 
     def __init__(self, data: bytes) -> None:
-        parsed = self._STRUCT.parse(data[8:])
-        self.__dict__.update(parsed)
-
-async def get_pump_curve_state(conn: AsyncClient, curve_address: Pubkey) -> BondingCurveState:
-    response = await conn.get_account_info(curve_address)
-    if not response.value or not response.value.data:
+        (
+            self.virtual_token_reserves,
+            self.virtual_sol_reserves,
+            self.real_token_reserves,
+            self.real_sol_reserves,
+            self.token_total_supply,
+            self.complete,
+        ) = _UNPACK_BONDING_CURVE(data, 8)
+
+def parse_pump_curve_state(account) -> BondingCurveState:
+    if not account or not account.data:
         raise ValueError("Invalid curve state: No data")
 
-    data = response.value.data
-    if data[:8] != EXPECTED_DISCRIMINATOR:
+    data = account.data
+    if not data.startswith(EXPECTED_DISCRIMINATOR):
         raise ValueError("Invalid curve state discriminator")
 
     return BondingCurveState(data)
@@ -57,85 +86,84 @@ def calculate_pump_curve_price(curve_state: BondingCurveState) -> float:
 
     return (curve_state.virtual_sol_reserves / LAMPORTS_PER_SOL) / (curve_state.virtual_token_reserves / 10 ** TOKEN_DECIMALS)
 
-async def get_token_balance(conn: AsyncClient, associated_token_account: Pubkey):
-    response = await conn.get_token_account_balance(associated_token_account)
-    if response.value:
-        return int(response.value.amount)
-    return 0
-
-async def sell_token(mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, slippage: float = 0.25, max_retries=5):
-    private_key = base58.b58decode(PRIVATE_KEY)
-    payer = Keypair.from_bytes(private_key)
-
-    async with AsyncClient(RPC_ENDPOINT) as client:
-        associated_token_account = get_associated_token_address(payer.pubkey(), mint)
-        
-        # Get token balance
-        token_balance = await get_token_balance(client, associated_token_account)
-        token_balance_decimal = token_balance / 10**TOKEN_DECIMALS
-        print(f"Token balance: {token_balance_decimal}")
-        if token_balance == 0:
-            print("No tokens to sell.")
-            return
-
-        # Fetch the token price
-        curve_state = await get_pump_curve_state(client, bonding_curve)
-        token_price_sol = calculate_pump_curve_price(curve_state)
-        print(f"Price per Token: {token_price_sol:.20f} SOL")
-
-        # Calculate minimum SOL output
-        amount = token_balance
-        min_sol_output = float(token_balance_decimal) * float(token_price_sol)
-        slippage_factor = 1 - slippage
-        min_sol_output = int((min_sol_output * slippage_factor) * LAMPORTS_PER_SOL)
-        
-        print(f"Selling {token_balance_decimal} tokens")
-        print(f"Minimum SOL output: {min_sol_output / LAMPORTS_PER_SOL:.10f} SOL")
-
-        for attempt in range(max_retries):
-            try:
-                accounts = [
-                    AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
-                    AccountMeta(pubkey=payer.pubkey(), is_signer=True, is_writable=True),
-                    AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
-                    AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
-                ]
-
-                discriminator = struct.pack("<Q", 12502976635542562355)
-                data = discriminator + struct.pack("<Q", amount) + struct.pack("<Q", min_sol_output)
-                sell_ix = Instruction(PUMP_PROGRAM, data, accounts)
-
-                recent_blockhash = await client.get_latest_blockhash()
-                transaction = Transaction()
-                transaction.add(sell_ix)
-                transaction.recent_blockhash = recent_blockhash.value.blockhash
-
-                tx = await client.send_transaction(
-                    transaction,
-                    payer,
-                    opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
-                )
-
-                print(f"Transaction sent: https://explorer.solana.com/tx/{tx.value}")
-
-                await client.confirm_transaction(tx.value, commitment="confirmed")
-                print("Transaction confirmed")
-
-                return tx.value
-
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    print("Max retries reached. Unable to complete the transaction.")
\ No newline at end of file
+def parse_token_balance(account) -> int:
+    if not account or len(account.data) < TOKEN_ACCOUNT_AMOUNT_OFFSET + 8:
+        return 0
+    return _UNPACK_TOKEN_AMOUNT(account.data, TOKEN_ACCOUNT_AMOUNT_OFFSET)[0]
+
+async def sell_token(client: AsyncClient, mint: Pubkey, bonding_curve: Pubkey, associated_bonding_curve: Pubkey, slippage: float = 0.25, max_retries=5):
+    payer = get_payer()
+    payer_pubkey = payer.pubkey()
+
+    associated_token_account = get_associated_token_address(payer_pubkey, mint)
+    
+    # Fetch the token balance and the bonding curve in a single round-trip
+    accounts_response = await client.get_multiple_accounts([associated_token_account, bonding_curve])
+    ata_account, curve_account = accounts_response.value
+
+    token_balance = parse_token_balance(ata_account)
+    token_balance_decimal = token_balance / 10**TOKEN_DECIMALS
+    print(f"Token balance: {token_balance_decimal}")
+    if token_balance == 0:
+        print("No tokens to sell.")
+        return
+
+    # Price the tokens from the curve fetched above
+    curve_state = parse_pump_curve_state(curve_account)
+    token_price_sol = calculate_pump_curve_price(curve_state)
+    print(f"Price per Token: {token_price_sol:.20f} SOL")
+
+    # Calculate minimum SOL output
+    amount = token_balance
+    min_sol_output = float(token_balance_decimal) * float(token_price_sol)
+    slippage_factor = 1 - slippage
+    min_sol_output = int((min_sol_output * slippage_factor) * LAMPORTS_PER_SOL)
+    
+    print(f"Selling {token_balance_decimal} tokens")
+    print(f"Minimum SOL output: {min_sol_output / LAMPORTS_PER_SOL:.10f} SOL")
+
+    accounts = [
+        *_STATIC_SELL_ACCOUNTS_PREFIX,
+        AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=associated_bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=associated_token_account, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=payer_pubkey, is_signer=True, is_writable=True),
+        *_STATIC_SELL_ACCOUNTS_SUFFIX,
+    ]
+    data = SELL_DISCRIMINATOR + struct.pack("<Q", amount) + struct.pack("<Q", min_sol_output)
+    sell_ix = Instruction(PUMP_PROGRAM, data, accounts)
+
+    transaction = None
+    for attempt in range(max_retries):
+        try:
+            recent_blockhash = await blockhash_cache.get(client)
+            if transaction is None or transaction.message.recent_blockhash != recent_blockhash:
+                message = MessageV0.try_compile(payer_pubkey, [sell_ix], [], recent_blockhash)
+                transaction = VersionedTransaction(message, [payer])
+
+            tx = await client.send_raw_transaction(
+                bytes(transaction),
+                opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
+            )
+
+            print(f"Transaction sent: https://explorer.solana.com/tx/{tx.value}")
+
+            # confirm_transaction only waits for the commitment, a reverted sell is confirmed too
+            resp = await client.confirm_transaction(tx.value, commitment="confirmed")
+            err = resp.value[0].err if resp.value and resp.value[0] else None
+            if err is not None:
+                print(f"Transaction failed: {err}")
+                return None
+            print("Transaction confirmed")
+
+            return tx.value
+
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed: {str(e)}")
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt
+                print(f"Retrying in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+            else:
+                print("Max retries reached. Unable to complete the transaction.")
\ No newline at end of file
@@ -9,7 +9,6 @@ import os
 import argparse
 from datetime import datetime
 
-from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction
 from solana.rpc.commitment import Confirmed
 from solana.rpc.types import TxOpts
@@ -23,10 +22,10 @@ from solders.transaction import VersionedTransaction
 from spl.token.instructions import get_associated_token_address
 import spl.token.instructions as spl_token
 
-from config import *
+from config import CFG
 
 # Import functions from buy.py
-from buy import get_pump_curve_state, calculate_pump_curve_price, buy_token, listen_for_create_transaction
+from buy import buy_token, listen_for_create_transaction, blockhash_cache, RpcPool, connect_websocket, install_event_loop
 
 # Import functions from sell.py
 from sell import sell_token
@@ -44,14 +43,14 @@ def log_trade(action, token_data, price, tx_hash):
         json.dump(log_entry, log_file)
         log_file.write("\n")
 
-async def trade(websocket=None, match_string=None, bro_address=None, marry_mode=False, yolo_mode=False):
+async def trade(client, websocket=None, match_string=None, bro_address=None, marry_mode=False, yolo_mode=False):
     if websocket is None:
-        async with websockets.connect(WSS_ENDPOINT) as websocket:
-            await _trade(websocket, match_string, bro_address, marry_mode, yolo_mode)
+        async with connect_websocket() as websocket:
+            await _trade(client, websocket, match_string, bro_address, marry_mode, yolo_mode)
     else:
-        await _trade(websocket, match_string, bro_address, marry_mode, yolo_mode)
+        await _trade(client, websocket, match_string, bro_address, marry_mode, yolo_mode)
 
-async def _trade(websocket, match_string=None, bro_address=None, marry_mode=False, yolo_mode=False):
+async def _trade(client, websocket, match_string=None, bro_address=None, marry_mode=False, yolo_mode=False):
     while True:
         print("Waiting for a new token creation...")
         token_data = await listen_for_create_transaction(websocket)
@@ -85,15 +84,10 @@ async def _trade(websocket, match_string=None, bro_address=None, marry_mode=Fals
         bonding_curve = Pubkey.from_string(token_data['bondingCurve'])
         associated_bonding_curve = Pubkey.from_string(token_data['associatedBondingCurve'])
 
-        # Fetch the token price
-        async with AsyncClient(RPC_ENDPOINT) as client:
-            curve_state = await get_pump_curve_state(client, bonding_curve)
-            token_price_sol = calculate_pump_curve_price(curve_state)
-
         print(f"Bonding curve address: {bonding_curve}")
-        print(f"Token price: {token_price_sol:.10f} SOL")
-        print(f"Buying {BUY_AMOUNT:.6f} SOL worth of the new token with {BUY_SLIPPAGE*100:.1f}% slippage tolerance...")
-        buy_tx_hash = await buy_token(mint, bonding_curve, associated_bonding_curve, BUY_AMOUNT, BUY_SLIPPAGE)
+        print(f"Buying {CFG.BUY_AMOUNT:.6f} SOL worth of the new token with {CFG.BUY_SLIPPAGE*100:.1f}% slippage tolerance...")
+        # The price comes from the same batched fetch the buy is built from
+        buy_tx_hash, token_price_sol = await buy_token(client, mint, bonding_curve, associated_bonding_curve, CFG.BUY_AMOUNT, CFG.BUY_SLIPPAGE)
         if buy_tx_hash:
             log_trade("buy", token_data, token_price_sol, str(buy_tx_hash))
         else:
@@ -103,8 +97,8 @@ async def _trade(websocket, match_string=None, bro_address=None, marry_mode=Fals
             print("Waiting for 20 seconds before selling...")
             await asyncio.sleep(20)
 
-            print(f"Selling tokens with {SELL_SLIPPAGE*100:.1f}% slippage tolerance...")
-            sell_tx_hash = await sell_token(mint, bonding_curve, associated_bonding_curve, SELL_SLIPPAGE)
+            print(f"Selling tokens with {CFG.SELL_SLIPPAGE*100:.1f}% slippage tolerance...")
+            sell_tx_hash = await sell_token(client, mint, bonding_curve, associated_bonding_curve, CFG.SELL_SLIPPAGE)
             if sell_tx_hash:
                 log_trade("sell", token_data, token_price_sol, str(sell_tx_hash))
             else:
@@ -116,13 +110,25 @@ async def _trade(websocket, match_string=None, bro_address=None, marry_mode=Fals
             break
 
 async def main(yolo_mode=False, match_string=None, bro_address=None, marry_mode=False):
+    # One RPC pool for the whole run, so connections stay warm between trades
+    client = await RpcPool.create()
+    client.start()
+    # Keep a fresh blockhash around so buys don't wait for an extra RPC round-trip
+    blockhash_cache.start(client)
+    try:
+        await _main(client, yolo_mode, match_string, bro_address, marry_mode)
+    finally:
+        await blockhash_cache.stop()
+        await client.close()
+
+async def _main(client, yolo_mode=False, match_string=None, bro_address=None, marry_mode=False):
     if yolo_mode:
         while True:
             try:
-                async with websockets.connect(WSS_ENDPOINT) as websocket:
+                async with connect_websocket() as websocket:
                     while True:
                         try:
-                            await trade(websocket, match_string, bro_address, marry_mode, yolo_mode)
+                            await trade(client, websocket, match_string, bro_address, marry_mode, yolo_mode)
                         except websockets.exceptions.ConnectionClosed:
                             print("WebSocket connection closed. Reconnecting...")
                             break
@@ -136,16 +142,8 @@ async def main(yolo_mode=False, match_string=None, bro_address=None, marry_mode=
                 await asyncio.sleep(5)
     else:
         # For non-YOLO mode, create a websocket connection and close it after one trade
-        async with websockets.connect(WSS_ENDPOINT) as websocket:
-            await trade(websocket, match_string, bro_address, marry_mode, yolo_mode)
-
-async def ping_websocket(websocket):
-    while True:
-        try:
-            await websocket.ping()
-            await asyncio.sleep(20) # Send a ping every 20 seconds
-        except:
-            break
+        async with connect_websocket() as websocket:
+            await trade(client, websocket, match_string, bro_address, marry_mode, yolo_mode)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Trade tokens on Solana.")
@@ -154,4 +152,5 @@ if __name__ == "__main__":
     parser.add_argument("--bro", type=str, help="Only trade tokens created by this user address")
     parser.add_argument("--marry", action="store_true", help="Only buy tokens, skip selling")
     args = parser.parse_args()
+    install_event_loop()
     asyncio.run(main(yolo_mode=args.yolo, match_string=args.match, bro_address=args.bro, marry_mode=args.marry))
\ No newline at end of file
@@ -0,0 +1,40 @@
+import functools
+import struct
+
+import base58
+import httpx
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from config import CFG
+
+RPC_TIMEOUT = 10  # seconds
+
+_U32 = struct.Struct("<I")
+
+async def create_rpc_client(endpoint: str, limits: httpx.Limits, timeout: float = RPC_TIMEOUT) -> AsyncClient:
+    """
+    Creates an AsyncClient whose HTTP session uses the given connection pool limits.
+    solana-py doesn't expose the httpx pool settings, so the provider's session is closed and replaced.
+    """
+    client = AsyncClient(endpoint, timeout=timeout)
+    await client._provider.session.aclose()
+    client._provider.session = httpx.AsyncClient(timeout=timeout, limits=limits)
+    return client
+
+@functools.cache
+def get_payer() -> Keypair:
+    """
+    The payer is fixed for the lifetime of the process, so the key is decoded once, on first use
+    """
+    return Keypair.from_bytes(base58.b58decode(CFG.PRIVATE_KEY))
+
+# Readers take a memoryview, so slicing a field doesn't copy it before it's decoded
+def read_string(view: memoryview, offset: int) -> tuple[str, int]:
+    length = _U32.unpack_from(view, offset)[0]
+    offset += 4
+    return str(view[offset:offset+length], 'utf-8'), offset + length
+
+def read_public_key(view: memoryview, offset: int) -> tuple[Pubkey, int]:
+    return Pubkey.from_bytes(view[offset:offset+32].tobytes()), offset + 32